@@ -0,0 +1,843 @@
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+
+import pandas as pd
+
+# Ubicación del almacén local de datos (configurable por variable de entorno)
+DIRECTORIO_DATOS = os.environ.get(
+    "HOLMAN_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+)
+RUTA_DB = os.path.join(DIRECTORIO_DATOS, "holman.db")
+
+# Columnas de la tabla de facturas y su nombre visible en el dashboard
+COLUMNAS_FACTURA = {
+    "factura": "Factura",
+    "fecha": "Fecha",
+    "proveedor": "Proveedor",
+    "monto_total": "Monto Total (MXN)",
+    "estado_pago": "Estado de Pago",
+    "productos": "Productos",
+}
+# Columnas por las que se puede ordenar una página de facturas (todas indexadas junto con el desempate por factura)
+COLUMNAS_ORDEN_FACTURA = {nombre: columna for columna, nombre in COLUMNAS_FACTURA.items() if columna != "productos"}
+# Límite superior de un rango de prefijo: ningún texto que empiece con el prefijo lo supera
+FIN_PREFIJO = "\U0010ffff"
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS facturas (
+    factura TEXT PRIMARY KEY,
+    fecha TEXT NOT NULL,
+    proveedor TEXT NOT NULL,
+    monto_total REAL NOT NULL,
+    estado_pago TEXT NOT NULL,
+    productos TEXT NOT NULL DEFAULT ''
+);
+DROP INDEX IF EXISTS idx_facturas_proveedor;
+CREATE INDEX IF NOT EXISTS idx_facturas_proveedor_fecha ON facturas (proveedor, fecha);
+-- Los índices de orden terminan en factura, el desempate de las páginas: así ni un estado de
+-- pago con cientos de miles de filas necesita ordenarse en un árbol temporal
+DROP INDEX IF EXISTS idx_facturas_fecha;
+DROP INDEX IF EXISTS idx_facturas_estado_pago;
+DROP INDEX IF EXISTS idx_facturas_monto_total;
+CREATE INDEX IF NOT EXISTS idx_facturas_proveedor_factura ON facturas (proveedor, factura);
+CREATE INDEX IF NOT EXISTS idx_facturas_fecha_factura ON facturas (fecha, factura);
+CREATE INDEX IF NOT EXISTS idx_facturas_estado_pago_factura ON facturas (estado_pago, factura);
+CREATE INDEX IF NOT EXISTS idx_facturas_monto_total_factura ON facturas (monto_total, factura);
+
+CREATE TABLE IF NOT EXISTS catalogo_productos (
+    producto TEXT PRIMARY KEY,
+    costo_unitario REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS lineas_factura (
+    factura TEXT NOT NULL REFERENCES facturas (factura),
+    linea INTEGER NOT NULL,
+    producto TEXT NOT NULL,
+    cantidad REAL NOT NULL,
+    PRIMARY KEY (factura, linea)
+);
+CREATE INDEX IF NOT EXISTS idx_lineas_factura_producto ON lineas_factura (producto, factura);
+
+CREATE TABLE IF NOT EXISTS proyectos (
+    id_proyecto INTEGER PRIMARY KEY,
+    nombre TEXT NOT NULL,
+    responsable TEXT NOT NULL,
+    estado_levantamiento TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS programas_obra (
+    id_proyecto INTEGER PRIMARY KEY REFERENCES proyectos (id_proyecto),
+    fecha_inicio TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS actividades (
+    id_actividad INTEGER PRIMARY KEY,
+    id_proyecto INTEGER NOT NULL REFERENCES proyectos (id_proyecto),
+    actividad TEXT NOT NULL,
+    duracion INTEGER NOT NULL,
+    predecesoras TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_actividades_proyecto ON actividades (id_proyecto);
+
+-- Ubicación geográfica de cada obra
+CREATE TABLE IF NOT EXISTS ubicaciones_proyecto (
+    id_proyecto INTEGER PRIMARY KEY REFERENCES proyectos (id_proyecto),
+    latitud REAL NOT NULL,
+    longitud REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS ejecucion (
+    id_proyecto INTEGER PRIMARY KEY REFERENCES proyectos (id_proyecto),
+    progreso INTEGER NOT NULL,
+    documentos TEXT NOT NULL,
+    estado_general TEXT NOT NULL
+);
+
+-- Bitácora de avance de obra: solo se agregan renglones, nunca se modifican
+CREATE TABLE IF NOT EXISTS eventos_avance (
+    id_evento INTEGER PRIMARY KEY AUTOINCREMENT,
+    id_proyecto INTEGER NOT NULL REFERENCES proyectos (id_proyecto),
+    progreso INTEGER NOT NULL,
+    documentos TEXT NOT NULL DEFAULT '',
+    estado TEXT,
+    registrado TEXT NOT NULL
+);
+
+-- Puntaje de anomalía de cada factura para una versión del modelo
+CREATE TABLE IF NOT EXISTS puntajes_anomalia (
+    factura TEXT PRIMARY KEY REFERENCES facturas (factura),
+    version_modelo TEXT NOT NULL,
+    puntaje REAL NOT NULL,
+    anomala INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_puntajes_anomalia_puntaje ON puntajes_anomalia (version_modelo, puntaje);
+-- Una factura que cambia o se borra pierde su puntaje; si sigue existiendo se vuelve a puntuar
+CREATE TRIGGER IF NOT EXISTS trg_facturas_puntaje_cambio AFTER UPDATE ON facturas
+BEGIN
+    DELETE FROM puntajes_anomalia WHERE factura = old.factura;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_facturas_puntaje_baja AFTER DELETE ON facturas
+BEGIN
+    DELETE FROM puntajes_anomalia WHERE factura = old.factura;
+END;
+
+-- Último evento de cada bitácora ya incorporado a su tabla materializada
+CREATE TABLE IF NOT EXISTS marcas_lectura (
+    bitacora TEXT PRIMARY KEY,
+    ultimo_evento INTEGER NOT NULL
+);
+
+-- CFDI ya importados: el UUID del timbre identifica al comprobante y la huella del archivo
+-- permite saltarlo sin volver a leerlo. factura es NULL si el comprobante no es de ingreso.
+CREATE TABLE IF NOT EXISTS cfdi_ingeridos (
+    uuid TEXT PRIMARY KEY,
+    factura TEXT REFERENCES facturas (factura),
+    huella_archivo TEXT NOT NULL,
+    ingerido TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_cfdi_ingeridos_huella ON cfdi_ingeridos (huella_archivo);
+
+"""
+
+# Resúmenes de cobranza: tabla -> (columna de agrupación, expresión sobre la fila de facturas).
+# Cada resumen lleva facturas y monto por (columna, estado_pago); los disparadores de
+# facturas los mantienen al día sumando o restando solo la factura que cambia.
+RESUMENES_COBRANZA = {
+    "cobranza_proveedor": ("proveedor", "{fila}.proveedor"),
+    "cobranza_mensual": ("mes", "substr({fila}.fecha, 1, 7)"),
+    "cobranza_diaria": ("fecha", "{fila}.fecha"),
+}
+
+
+def _mover_cobranza(fila, signo):
+    # Suma (signo "") o resta (signo "-") la factura old/new en cada resumen
+    return "".join(
+        f"""
+    INSERT INTO {tabla} VALUES ({expresion.format(fila=fila)}, {fila}.estado_pago, {signo}1, {signo}{fila}.monto_total)
+    ON CONFLICT ({columna}, estado_pago)
+    DO UPDATE SET facturas = facturas + excluded.facturas, monto = monto + excluded.monto;"""
+        for tabla, (columna, expresion) in RESUMENES_COBRANZA.items()
+    )
+
+
+ESQUEMA_COBRANZA = "".join(
+    f"""
+CREATE TABLE IF NOT EXISTS {tabla} (
+    {columna} TEXT NOT NULL,
+    estado_pago TEXT NOT NULL,
+    facturas INTEGER NOT NULL,
+    monto REAL NOT NULL,
+    PRIMARY KEY ({columna}, estado_pago)
+);"""
+    for tabla, (columna, _) in RESUMENES_COBRANZA.items()
+) + f"""
+CREATE TRIGGER IF NOT EXISTS trg_facturas_cobranza_alta AFTER INSERT ON facturas
+BEGIN{_mover_cobranza("new", "")}
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_facturas_cobranza_baja AFTER DELETE ON facturas
+BEGIN{_mover_cobranza("old", "-")}
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_facturas_cobranza_cambio
+AFTER UPDATE OF fecha, proveedor, monto_total, estado_pago ON facturas
+BEGIN{_mover_cobranza("old", "-")}{_mover_cobranza("new", "")}
+END;
+"""
+
+# Contador de versión por grupo de tablas: cualquier alta, baja o cambio en ellas lo incrementa.
+# Sirve para saber si un resultado derivado (p. ej. un ZIP exportado o el mapa de obras) sigue vigente.
+TABLAS_VERSIONADAS = {
+    "facturas": "facturas",
+    "lineas_factura": "facturas",
+    "proyectos": "sitios",
+    "ubicaciones_proyecto": "sitios",
+}
+
+ESQUEMA_VERSIONES = """
+CREATE TABLE IF NOT EXISTS versiones_datos (
+    grupo TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);""" + "".join(
+    f"""
+INSERT OR IGNORE INTO versiones_datos VALUES ('{grupo}', 0);"""
+    for grupo in dict.fromkeys(TABLAS_VERSIONADAS.values())
+) + "".join(
+    f"""
+CREATE TRIGGER IF NOT EXISTS trg_{tabla}_version_{evento.lower()} AFTER {evento} ON {tabla}
+BEGIN
+    UPDATE versiones_datos SET version = version + 1 WHERE grupo = '{grupo}';
+END;"""
+    for tabla, grupo in TABLAS_VERSIONADAS.items()
+    for evento in ("INSERT", "UPDATE", "DELETE")
+)
+
+# Recalcula los resúmenes desde cero (almacenes creados antes de los disparadores)
+RECONSTRUIR_COBRANZA = "BEGIN;" + "".join(
+    f"""
+DELETE FROM {tabla};
+INSERT INTO {tabla}
+    SELECT {expresion.format(fila="facturas")}, estado_pago, COUNT(*), SUM(monto_total) FROM facturas GROUP BY 1, 2;"""
+    for tabla, (_, expresion) in RESUMENES_COBRANZA.items()
+) + "\nCOMMIT;"
+
+ESTADOS_PAGO = ["Pendiente", "Pagado"]
+
+# Tramos de antigüedad de saldos pendientes: (días hasta, etiqueta)
+TRAMOS_ANTIGUEDAD = [(30, "0-30 días"), (60, "31-60 días"), (90, "61-90 días"), (None, "Más de 90 días")]
+
+# Facturas simuladas con las que se inicializa un almacén vacío
+FACTURAS_INICIALES = [
+    ("F001", "2024-01-15", "Proveedor A", 500000, "Pendiente", "Materiales de construcción, Mano de obra, Equipos"),
+    ("F002", "2024-02-05", "Proveedor B", 300000, "Pagado", "Materiales, Mano de obra"),
+    ("F003", "2024-03-10", "Proveedor C", 250000, "Pendiente", "Equipos, Materiales de construcción"),
+]
+
+CATALOGO_INICIAL = [
+    ("Materiales de construcción", 50000),
+    ("Mano de obra", 30000),
+    ("Equipos", 15000),
+    ("Materiales", 20000),
+]
+
+LINEAS_FACTURA_INICIALES = [
+    ("F001", 1, "Materiales de construcción", 5),
+    ("F001", 2, "Mano de obra", 10),
+    ("F001", 3, "Equipos", 7),
+    ("F002", 1, "Materiales", 5),
+    ("F002", 2, "Mano de obra", 10),
+    ("F003", 1, "Equipos", 5),
+    ("F003", 2, "Materiales de construcción", 10),
+]
+
+PROYECTOS_INICIALES = [
+    (1, "Edificio Corporativo A", "Arq. Pérez", "Completado"),
+    (2, "Planta Industrial B", "Ing. López", "En Progreso"),
+    (3, "Residencial C", "Arq. Martínez", "Pendiente"),
+]
+
+UBICACIONES_INICIALES = [
+    (1, 19.4326, -99.1332),
+    (2, 25.6866, -100.3161),
+    (3, 20.6597, -103.3496),
+]
+
+PROGRAMAS_OBRA_INICIALES = [
+    (1, "2024-01-01"),
+    (2, "2024-02-01"),
+    (3, "2024-03-01"),
+]
+
+# Plantilla de actividades en secuencia: (actividad, duración en días)
+ACTIVIDADES_PLANTILLA = [
+    ("Preparación del Terreno", 10),
+    ("Adquisición de Materiales", 15),
+    ("Construcción de Cimientos", 20),
+    ("Estructura Principal", 30),
+    ("Acabados Finales", 25),
+]
+
+ACTIVIDADES_INICIALES = [
+    (
+        (id_proyecto - 1) * len(ACTIVIDADES_PLANTILLA) + orden,
+        id_proyecto,
+        actividad,
+        duracion,
+        str((id_proyecto - 1) * len(ACTIVIDADES_PLANTILLA) + orden - 1) if orden > 1 else "",
+    )
+    for id_proyecto, _ in PROGRAMAS_OBRA_INICIALES
+    for orden, (actividad, duracion) in enumerate(ACTIVIDADES_PLANTILLA, 1)
+]
+
+# Eventos de avance con los que se inicializa la bitácora:
+# (id_evento, id_proyecto, progreso, documentos, estado, registrado)
+EVENTOS_AVANCE_INICIALES = [
+    (1, 1, 100, "Planos, Contratos, Reporte de Sueldos", None, "2024-04-10T18:00:00"),
+    (2, 2, 65, "Planos, Contratos", None, "2024-04-10T18:00:00"),
+    (3, 3, 30, "", "Retrasado", "2024-04-10T18:00:00"),
+]
+
+# Tablas que se siembran con los datos simulados cuando están vacías
+DATOS_INICIALES = {
+    "facturas": FACTURAS_INICIALES,
+    "catalogo_productos": CATALOGO_INICIAL,
+    "lineas_factura": LINEAS_FACTURA_INICIALES,
+    "proyectos": PROYECTOS_INICIALES,
+    "ubicaciones_proyecto": UBICACIONES_INICIALES,
+    "programas_obra": PROGRAMAS_OBRA_INICIALES,
+    "actividades": ACTIVIDADES_INICIALES,
+    "eventos_avance": EVENTOS_AVANCE_INICIALES,
+}
+
+_inicializado = set()
+
+
+def conectar():
+    # Abre una conexión y garantiza que el esquema exista (una sola vez por proceso y ruta)
+    os.makedirs(os.path.dirname(RUTA_DB), exist_ok=True)
+    conexion = sqlite3.connect(RUTA_DB, timeout=30)
+    # Con INSERT OR REPLACE, la fila reemplazada también pasa por el disparador de baja
+    conexion.execute("PRAGMA recursive_triggers = ON")
+    if RUTA_DB not in _inicializado:
+        conexion.execute("PRAGMA journal_mode=WAL")
+        conexion.executescript(ESQUEMA + ESQUEMA_COBRANZA + ESQUEMA_VERSIONES)
+        if conexion.execute("SELECT NOT EXISTS (SELECT 1 FROM cobranza_diaria)").fetchone()[0]:
+            conexion.executescript(RECONSTRUIR_COBRANZA)
+        for tabla, filas in DATOS_INICIALES.items():
+            if conexion.execute(f"SELECT COUNT(*) FROM {tabla}").fetchone()[0] == 0:
+                marcadores = ", ".join("?" * len(filas[0]))
+                conexion.executemany(f"INSERT INTO {tabla} VALUES ({marcadores})", filas)
+        conexion.commit()
+        _inicializado.add(RUTA_DB)
+    return conexion
+
+
+def _a_dataframe(filas):
+    return pd.DataFrame(filas, columns=list(COLUMNAS_FACTURA.values()))
+
+
+def separar_productos(productos):
+    # Convierte "Producto A, Producto B" en la lista de productos de la factura
+    return [producto.strip() for producto in (productos or "").split(",") if producto.strip()]
+
+
+def _escribir_facturas(conexion, facturas):
+    # Inserta o reemplaza facturas; cada factura es un dict con los nombres visibles de columna.
+    # Sus líneas se escriben una sola vez aquí: las de "Líneas" [(producto, cantidad), ...]
+    # si vienen, o las que resultan de separar el texto de "Productos" (cantidad 1).
+    filas, lineas = [], []
+    for factura in facturas:
+        filas.append(tuple(factura[nombre] for nombre in COLUMNAS_FACTURA.values()))
+        partidas = factura.get("Líneas") or [(producto, 1) for producto in separar_productos(factura["Productos"])]
+        lineas.extend(
+            (factura["Factura"], linea, producto, cantidad)
+            for linea, (producto, cantidad) in enumerate(partidas, 1)
+        )
+    conexion.executemany("INSERT OR REPLACE INTO facturas VALUES (?, ?, ?, ?, ?, ?)", filas)
+    conexion.executemany("DELETE FROM lineas_factura WHERE factura = ?", [(fila[0],) for fila in filas])
+    conexion.executemany("INSERT INTO lineas_factura VALUES (?, ?, ?, ?)", lineas)
+
+
+def _existentes(tabla, columna, valores, tamano_bloque=500):
+    # Valores que ya están en la columna indexada, consultados por bloques de parámetros
+    valores = list(dict.fromkeys(valores))
+    existentes = set()
+    with closing(conectar()) as conexion:
+        for inicio in range(0, len(valores), tamano_bloque):
+            bloque = valores[inicio:inicio + tamano_bloque]
+            existentes.update(
+                fila[0] for fila in conexion.execute(
+                    f"SELECT {columna} FROM {tabla} WHERE {columna} IN ({', '.join('?' * len(bloque))})", bloque
+                )
+            )
+    return existentes
+
+
+def facturas_existentes(numeros):
+    return _existentes("facturas", "factura", numeros)
+
+
+def huellas_cfdi_ingeridas(huellas):
+    return _existentes("cfdi_ingeridos", "huella_archivo", huellas)
+
+
+def uuids_cfdi_ingeridos(uuids):
+    return _existentes("cfdi_ingeridos", "uuid", uuids)
+
+
+def guardar_cfdi(facturas, omitidos=()):
+    # facturas: dicts de _escribir_facturas con "UUID" y "Huella Archivo"; omitidos: (uuid, huella) de
+    # comprobantes que no son de ingreso. Facturas y registro de CFDI se escriben en una transacción.
+    ingerido = datetime.now().isoformat(timespec="seconds")
+    with closing(conectar()) as conexion, conexion:
+        _escribir_facturas(conexion, facturas)
+        conexion.executemany(
+            "INSERT OR REPLACE INTO cfdi_ingeridos VALUES (?, ?, ?, ?)",
+            [(factura["UUID"], factura["Factura"], factura["Huella Archivo"], ingerido) for factura in facturas]
+            + [(uuid, None, huella, ingerido) for uuid, huella in omitidos],
+        )
+
+
+def listar_facturas():
+    # Tabla completa: proveedor y estado se repiten en muchas filas y se guardan como categorías
+    with closing(conectar()) as conexion:
+        filas = conexion.execute(
+            f"SELECT {', '.join(COLUMNAS_FACTURA)} FROM facturas ORDER BY factura"
+        ).fetchall()
+    return _a_dataframe(filas).astype({"Proveedor": "category", "Estado de Pago": "category"})
+
+
+def numeros_factura():
+    # Recorre solo el índice de la llave primaria
+    with closing(conectar()) as conexion:
+        return [fila[0] for fila in conexion.execute("SELECT factura FROM facturas ORDER BY factura")]
+
+
+def buscar_facturas(prefijo="", limite=50):
+    # Búsqueda por prefijo como rango sobre la llave primaria
+    with closing(conectar()) as conexion:
+        return [
+            fila[0] for fila in conexion.execute(
+                "SELECT factura FROM facturas WHERE factura >= ? AND factura < ? ORDER BY factura LIMIT ?",
+                (prefijo, prefijo + FIN_PREFIJO, limite),
+            )
+        ]
+
+
+def obtener_factura(numero):
+    # Búsqueda por llave primaria: acceso directo al índice, sin recorrer la tabla
+    if not numero:
+        return None
+    with closing(conectar()) as conexion:
+        fila = conexion.execute(
+            f"SELECT {', '.join(COLUMNAS_FACTURA)} FROM facturas WHERE factura = ?", (numero,)
+        ).fetchone()
+    if fila is None:
+        return None
+    return pd.Series(fila, index=list(COLUMNAS_FACTURA.values()))
+
+
+def listar_lineas_factura(numero):
+    # Recorre solo el rango de la llave primaria (factura, linea)
+    with closing(conectar()) as conexion:
+        return pd.read_sql_query(
+            """
+            SELECT linea AS "Línea", producto AS "Producto", cantidad AS "Cantidad"
+            FROM lineas_factura WHERE factura = ? ORDER BY linea
+            """,
+            conexion,
+            params=(numero,),
+        )
+
+
+def listar_productos():
+    # Valores distintos leídos del índice de producto
+    with closing(conectar()) as conexion:
+        return [fila[0] for fila in conexion.execute("SELECT DISTINCT producto FROM lineas_factura ORDER BY producto")]
+
+
+def listar_catalogo():
+    with closing(conectar()) as conexion:
+        return pd.read_sql_query(
+            'SELECT producto AS "Producto", costo_unitario AS "Costo Unitario (MXN)" FROM catalogo_productos',
+            conexion,
+        )
+
+
+def listar_levantamiento():
+    with closing(conectar()) as conexion:
+        return pd.read_sql_query(
+            """
+            SELECT id_proyecto AS "ID Proyecto", nombre AS "Nombre Proyecto",
+                   responsable AS "Responsable", estado_levantamiento AS "Estado Levantamiento"
+            FROM proyectos ORDER BY id_proyecto
+            """,
+            conexion,
+        )
+
+
+def listar_actividades():
+    with closing(conectar()) as conexion:
+        return pd.read_sql_query(
+            """
+            SELECT a.id_actividad AS "ID Actividad", a.id_proyecto AS "ID Proyecto",
+                   p.nombre AS "Nombre Proyecto", a.actividad AS "Actividad",
+                   a.duracion AS "Duración (días)", a.predecesoras AS "Predecesoras",
+                   po.fecha_inicio AS "Fecha Inicio Proyecto"
+            FROM actividades a
+            JOIN proyectos p ON p.id_proyecto = a.id_proyecto
+            JOIN programas_obra po ON po.id_proyecto = a.id_proyecto
+            ORDER BY a.id_proyecto, a.id_actividad
+            """,
+            conexion,
+        )
+
+
+def actualizar_actividades(actividades):
+    # Cada actividad es una tupla (duracion, predecesoras, id_actividad)
+    with closing(conectar()) as conexion, conexion:
+        conexion.executemany(
+            "UPDATE actividades SET duracion = ?, predecesoras = ? WHERE id_actividad = ?", actividades
+        )
+
+
+def listar_ejecucion():
+    with closing(conectar()) as conexion:
+        return pd.read_sql_query(
+            """
+            SELECT p.id_proyecto AS "ID Proyecto", p.nombre AS "Nombre Proyecto",
+                   e.progreso AS "Progreso (%)", e.documentos AS "Documentos Entregados",
+                   e.estado_general AS "Estado General"
+            FROM ejecucion e JOIN proyectos p ON p.id_proyecto = e.id_proyecto
+            ORDER BY p.id_proyecto
+            """,
+            conexion,
+        )
+
+
+def listar_sitios():
+    # Obras con ubicación y su estado de ejecución (las que aún no tienen avance quedan sin estado)
+    with closing(conectar()) as conexion:
+        return pd.read_sql_query(
+            """
+            SELECT p.id_proyecto AS "ID Proyecto", p.nombre AS "Nombre Proyecto", p.responsable AS "Responsable",
+                   u.latitud AS "Latitud", u.longitud AS "Longitud",
+                   COALESCE(e.progreso, 0) AS "Progreso (%)", COALESCE(e.estado_general, 'Sin registro') AS "Estado General"
+            FROM ubicaciones_proyecto u
+            JOIN proyectos p ON p.id_proyecto = u.id_proyecto
+            LEFT JOIN ejecucion e ON e.id_proyecto = u.id_proyecto
+            ORDER BY p.id_proyecto
+            """,
+            conexion,
+        )
+
+
+def contar_proyectos_sin_ubicacion():
+    with closing(conectar()) as conexion:
+        return conexion.execute(
+            "SELECT COUNT(*) FROM proyectos WHERE id_proyecto NOT IN (SELECT id_proyecto FROM ubicaciones_proyecto)"
+        ).fetchone()[0]
+
+
+def listar_proveedores():
+    # Valores distintos leídos del índice de proveedor
+    with closing(conectar()) as conexion:
+        return [fila[0] for fila in conexion.execute("SELECT DISTINCT proveedor FROM facturas ORDER BY proveedor")]
+
+
+def _filtro_facturas(desde=None, hasta=None, proveedores=None, estados=None, prefijo=None, producto=None):
+    # Construye la cláusula WHERE sobre columnas indexadas
+    condiciones, parametros = [], []
+    if prefijo:
+        condiciones.append("factura >= ? AND factura < ?")
+        parametros.extend([prefijo, prefijo + FIN_PREFIJO])
+    if producto:
+        condiciones.append("factura IN (SELECT factura FROM lineas_factura WHERE producto = ?)")
+        parametros.append(producto)
+    if desde:
+        condiciones.append("fecha >= ?")
+        parametros.append(str(desde))
+    if hasta:
+        condiciones.append("fecha <= ?")
+        parametros.append(str(hasta))
+    if proveedores:
+        condiciones.append(f"proveedor IN ({', '.join('?' * len(proveedores))})")
+        parametros.extend(proveedores)
+    if estados:
+        condiciones.append(f"estado_pago IN ({', '.join('?' * len(estados))})")
+        parametros.extend(estados)
+    clausula = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+    return clausula, parametros
+
+
+def contar_facturas(desde=None, hasta=None, proveedores=None, estados=None, prefijo=None, producto=None):
+    clausula, parametros = _filtro_facturas(desde, hasta, proveedores, estados, prefijo, producto)
+    with closing(conectar()) as conexion:
+        return conexion.execute(f"SELECT COUNT(*) FROM facturas {clausula}", parametros).fetchone()[0]
+
+
+def paginar_facturas(orden="Factura", descendente=False, desplazamiento=0, limite=50, **filtros):
+    # Una página de facturas filtrada y ordenada en SQLite; solo esas filas salen del almacén
+    clausula, parametros = _filtro_facturas(**filtros)
+    direccion = "DESC" if descendente else "ASC"
+    columna = COLUMNAS_ORDEN_FACTURA[orden]
+    orden_sql = f"factura {direccion}" if columna == "factura" else f"{columna} {direccion}, factura {direccion}"
+    with closing(conectar()) as conexion:
+        filas = conexion.execute(
+            f"""
+            SELECT {', '.join(COLUMNAS_FACTURA)} FROM facturas {clausula}
+            ORDER BY {orden_sql}
+            LIMIT ? OFFSET ?
+            """,
+            [*parametros, int(limite), int(desplazamiento)],
+        ).fetchall()
+    return _a_dataframe(filas)
+
+
+def iterar_facturas(desde=None, hasta=None, proveedores=None, estados=None, tamano_lote=500):
+    # Recorre las facturas filtradas en lotes de dicts, sin cargar todo el resultado en memoria
+    clausula, parametros = _filtro_facturas(desde, hasta, proveedores, estados)
+    nombres = list(COLUMNAS_FACTURA.values())
+    with closing(conectar()) as conexion:
+        cursor = conexion.execute(
+            f"SELECT {', '.join(COLUMNAS_FACTURA)} FROM facturas {clausula} ORDER BY factura", parametros
+        )
+        while True:
+            filas = cursor.fetchmany(tamano_lote)
+            if not filas:
+                break
+            yield [dict(zip(nombres, fila)) for fila in filas]
+
+
+def registrar_avance(id_proyecto, progreso, documentos="", estado=None, registrado=None):
+    # Agrega un evento a la bitácora de avance
+    with closing(conectar()) as conexion, conexion:
+        conexion.execute(
+            "INSERT INTO eventos_avance (id_proyecto, progreso, documentos, estado, registrado) VALUES (?, ?, ?, ?, ?)",
+            (int(id_proyecto), int(progreso), documentos, estado, registrado or datetime.now().isoformat(timespec="seconds")),
+        )
+
+
+def _estado_general(progreso, estado):
+    if progreso >= 100:
+        return "Finalizado"
+    return estado or "En Progreso"
+
+
+def plegar_eventos_avance():
+    # Incorpora a la tabla de ejecución solo los eventos posteriores a la última marca
+    # de lectura y devuelve la marca vigente (sirve como versión de los datos).
+    marca = "SELECT COALESCE((SELECT ultimo_evento FROM marcas_lectura WHERE bitacora = 'avance'), 0)"
+    with closing(conectar()) as conexion:
+        # Lectura simple primero: sin eventos nuevos no se pide el candado de escritura
+        ultimo_evento, ultimo_registrado = conexion.execute(
+            f"SELECT ({marca}), COALESCE((SELECT MAX(id_evento) FROM eventos_avance), 0)"
+        ).fetchone()
+        if ultimo_registrado <= ultimo_evento:
+            return ultimo_evento
+
+        # La marca se vuelve a leer dentro de la transacción: otra sesión pudo plegar los eventos
+        conexion.execute("BEGIN IMMEDIATE")
+        ultimo_evento = conexion.execute(marca).fetchone()[0]
+        eventos = conexion.execute(
+            "SELECT id_evento, id_proyecto, progreso, documentos, estado FROM eventos_avance "
+            "WHERE id_evento > ? ORDER BY id_evento",
+            (ultimo_evento,),
+        ).fetchall()
+        if not eventos:
+            conexion.rollback()
+            return ultimo_evento
+
+        proyectos = {evento[1] for evento in eventos}
+        estado_actual = {
+            id_proyecto: [progreso, documentos, estado]
+            for id_proyecto, progreso, documentos, estado in conexion.execute(
+                f"SELECT id_proyecto, progreso, documentos, estado_general FROM ejecucion "
+                f"WHERE id_proyecto IN ({', '.join('?' * len(proyectos))})",
+                list(proyectos),
+            )
+        }
+        for _, id_proyecto, progreso, documentos, estado in eventos:
+            anterior = estado_actual.get(id_proyecto, [0, "Pendiente", None])
+            # Los documentos entregados se acumulan entre eventos
+            entregados = [d for d in anterior[1].split(", ") if d and d != "Pendiente"]
+            entregados += [d.strip() for d in documentos.split(",") if d.strip() and d.strip() not in entregados]
+            estado_actual[id_proyecto] = [
+                progreso, ", ".join(entregados) or "Pendiente", _estado_general(progreso, estado),
+            ]
+
+        conexion.executemany(
+            "INSERT OR REPLACE INTO ejecucion VALUES (?, ?, ?, ?)",
+            [(id_proyecto, *valores) for id_proyecto, valores in estado_actual.items()],
+        )
+        ultimo_evento = eventos[-1][0]
+        conexion.execute(
+            "INSERT OR REPLACE INTO marcas_lectura VALUES ('avance', ?)", (ultimo_evento,)
+        )
+        conexion.commit()
+        return ultimo_evento
+
+
+def listar_lineas():
+    with closing(conectar()) as conexion:
+        return pd.read_sql_query(
+            'SELECT factura AS "Factura", producto AS "Producto", cantidad AS "Cantidad" FROM lineas_factura',
+            conexion,
+            dtype={"Producto": "category"},
+        )
+
+
+def _facturas_y_lineas(pendientes, parametros):
+    # pendientes: CTE "pendientes" con la fila y las columnas de las facturas a puntuar
+    with closing(conectar()) as conexion:
+        filas = conexion.execute(
+            pendientes + f"SELECT fila, {', '.join(COLUMNAS_FACTURA)} FROM pendientes", parametros
+        ).fetchall()
+        lineas = pd.read_sql_query(
+            pendientes + 'SELECT l.factura AS "Factura", l.producto AS "Producto", l.cantidad AS "Cantidad" '
+                         "FROM lineas_factura l JOIN pendientes USING (factura)",
+            conexion, params=parametros,
+        )
+    return _a_dataframe([fila[1:] for fila in filas]), lineas, [fila[0] for fila in filas]
+
+
+def facturas_para_puntuar(desde_fila, limite):
+    # Facturas (y sus líneas) insertadas o reemplazadas después de la fila indicada.
+    # INSERT OR REPLACE asigna un rowid nuevo, así que las facturas reemplazadas también aparecen;
+    # las que cambian en sitio (UPDATE) conservan su rowid y se recogen con facturas_sin_puntaje.
+    facturas, lineas, filas = _facturas_y_lineas(
+        "WITH pendientes AS (SELECT rowid AS fila, * FROM facturas WHERE rowid > ? ORDER BY rowid LIMIT ?)",
+        (desde_fila, limite),
+    )
+    return facturas, lineas, filas[-1] if filas else desde_fila
+
+
+def facturas_sin_puntaje(version_modelo, limite):
+    # Facturas sin puntaje de la versión del modelo: el disparador de cambio borra el de las modificadas
+    facturas, lineas, _ = _facturas_y_lineas(
+        """
+        WITH pendientes AS (
+            SELECT f.rowid AS fila, f.* FROM facturas f
+            LEFT JOIN puntajes_anomalia p ON p.factura = f.factura AND p.version_modelo = ?
+            WHERE p.factura IS NULL LIMIT ?
+        )
+        """,
+        (version_modelo, limite),
+    )
+    return facturas, lineas
+
+
+def guardar_puntajes(puntajes):
+    # Cada puntaje es una tupla (factura, version_modelo, puntaje, anomala)
+    with closing(conectar()) as conexion, conexion:
+        conexion.executemany("INSERT OR REPLACE INTO puntajes_anomalia VALUES (?, ?, ?, ?)", puntajes)
+
+
+def listar_anomalias(version_modelo, limite=500, solo_anomalas=True):
+    # Las facturas más atípicas primero, leídas por el índice (version_modelo, puntaje)
+    filtro = "AND p.anomala = 1" if solo_anomalas else ""
+    with closing(conectar()) as conexion:
+        return pd.read_sql_query(
+            f"""
+            SELECT f.factura AS "Factura", f.fecha AS "Fecha", f.proveedor AS "Proveedor",
+                   f.monto_total AS "Monto Total (MXN)", f.estado_pago AS "Estado de Pago",
+                   p.puntaje AS "Puntaje de Anomalía"
+            FROM puntajes_anomalia p JOIN facturas f ON f.factura = p.factura
+            WHERE p.version_modelo = ? {filtro}
+            ORDER BY p.puntaje ASC
+            LIMIT ?
+            """,
+            conexion, params=(version_modelo, limite),
+        )
+
+
+def contar_puntajes(version_modelo):
+    with closing(conectar()) as conexion:
+        return conexion.execute(
+            "SELECT COUNT(*), COALESCE(SUM(anomala), 0) FROM puntajes_anomalia WHERE version_modelo = ?",
+            (version_modelo,),
+        ).fetchone()
+
+
+def actualizar_estado_pago(numeros, estado):
+    # Los disparadores mueven cada factura entre los resúmenes de cobranza
+    with closing(conectar()) as conexion, conexion:
+        conexion.executemany("UPDATE facturas SET estado_pago = ? WHERE factura = ?", [(estado, numero) for numero in numeros])
+
+
+def _version_datos(grupo):
+    with closing(conectar()) as conexion:
+        return conexion.execute("SELECT version FROM versiones_datos WHERE grupo = ?", (grupo,)).fetchone()[0]
+
+
+def version_facturas():
+    # Contador que los disparadores incrementan con cada cambio en facturas o sus líneas
+    return _version_datos("facturas")
+
+
+def version_sitios():
+    # Contador que los disparadores incrementan con cada cambio en proyectos o sus ubicaciones
+    return _version_datos("sitios")
+
+
+def _listar_cobranza(tabla, columna, nombre):
+    # Un renglón por valor de la columna con montos y facturas de cada estado de pago
+    sumas = ", ".join(
+        f"SUM(CASE WHEN estado_pago = '{estado}' THEN {campo} ELSE 0 END) AS \"{etiqueta}\""
+        for campo, plantilla in (("monto", "{} (MXN)"), ("facturas", "Facturas {}"))
+        for estado in ESTADOS_PAGO
+        for etiqueta in [plantilla.format(estado)]
+    )
+    with closing(conectar()) as conexion:
+        return pd.read_sql_query(
+            f"""
+            SELECT {columna} AS "{nombre}", {sumas}
+            FROM {tabla} GROUP BY {columna} HAVING SUM(facturas) > 0 ORDER BY {columna}
+            """,
+            conexion,
+        )
+
+
+def cobranza_por_proveedor():
+    return _listar_cobranza("cobranza_proveedor", "proveedor", "Proveedor")
+
+
+def cobranza_por_mes():
+    return _listar_cobranza("cobranza_mensual", "mes", "Mes")
+
+
+def cobranza_por_antiguedad(hoy, estado="Pendiente"):
+    # Saldos por tramo de antigüedad a partir del resumen diario (un renglón por día con facturas)
+    casos = " ".join(
+        f"WHEN julianday(:hoy) - julianday(fecha) <= {dias} THEN '{etiqueta}'"
+        for dias, etiqueta in TRAMOS_ANTIGUEDAD if dias is not None
+    )
+    with closing(conectar()) as conexion:
+        filas = conexion.execute(
+            f"""
+            SELECT CASE {casos} ELSE '{TRAMOS_ANTIGUEDAD[-1][1]}' END AS tramo, SUM(facturas), SUM(monto)
+            FROM cobranza_diaria WHERE estado_pago = :estado AND facturas > 0 GROUP BY tramo
+            """,
+            {"hoy": str(hoy), "estado": estado},
+        ).fetchall()
+    totales = {tramo: (facturas, monto) for tramo, facturas, monto in filas}
+    return pd.DataFrame(
+        [(etiqueta, *totales.get(etiqueta, (0, 0.0))) for _, etiqueta in TRAMOS_ANTIGUEDAD],
+        columns=["Antigüedad", "Facturas", "Monto (MXN)"],
+    )
+
+
+def rango_antiguedad(hoy, etiqueta):
+    # Fechas de emisión (desde, hasta) que caen en un tramo de antigüedad
+    hoy = pd.Timestamp(hoy)
+    limite_inferior = 0
+    for dias, nombre in TRAMOS_ANTIGUEDAD:
+        if nombre == etiqueta:
+            # El primer tramo también incluye las facturas con fecha futura
+            hasta = (hoy - pd.Timedelta(days=limite_inferior)).date() if limite_inferior else None
+            desde = (hoy - pd.Timedelta(days=dias)).date() if dias is not None else None
+            return desde, hasta
+        limite_inferior = dias + 1
+    raise ValueError(f"Tramo de antigüedad desconocido: {etiqueta}")
@@ -0,0 +1,115 @@
+import threading
+import uuid
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from sklearn.ensemble import IsolationForest
+
+import almacen
+
+# Productos más frecuentes que se usan como columnas de la mezcla de productos
+MAX_PRODUCTOS_MEZCLA = 20
+# Facturas que se puntúan por lote al incorporar facturas nuevas
+TAMANO_LOTE_PUNTAJE = 20000
+
+
+def _estadisticas_proveedor(facturas):
+    montos = facturas["Monto Total (MXN)"].astype(float)
+    return montos.groupby(facturas["Proveedor"]).agg(["mean", "std"]), (montos.mean(), montos.std())
+
+
+def calcular_caracteristicas(facturas, lineas, modelo):
+    # Todas las características se calculan como operaciones de columna
+    montos = facturas["Monto Total (MXN)"].astype(float)
+    media_global, desviacion_global = modelo["estadisticas_globales"]
+    desviacion_global = desviacion_global if desviacion_global and not np.isnan(desviacion_global) else 1.0
+    estadisticas = modelo["estadisticas_proveedor"]
+
+    # Monto contra el historial del proveedor
+    # El proveedor puede llegar como categoría: el mapeo se vuelve a flotante antes de rellenar
+    media = facturas["Proveedor"].map(estadisticas["mean"]).astype(float).fillna(media_global)
+    desviacion = facturas["Proveedor"].map(estadisticas["std"]).astype(float).fillna(desviacion_global)
+    desviacion = desviacion.where(desviacion > 0, desviacion_global)
+    desvio_proveedor = (montos - media) / desviacion
+
+    # Días que lleva pendiente de pago, contados hasta la fecha de referencia del modelo: una factura
+    # puntuada días después del entrenamiento es comparable con las puntuadas ese día
+    dias = (modelo["fecha_referencia"] - pd.to_datetime(facturas["Fecha"], errors="coerce")).dt.days
+    retraso_pago = dias.where(facturas["Estado de Pago"] == "Pendiente", 0).clip(lower=0).fillna(0)
+
+    # Mezcla de productos: participación de cada producto en la cantidad de la factura
+    mezcla = (
+        lineas.pivot_table(index="Factura", columns="Producto", values="Cantidad", aggfunc="sum", observed=True)
+        .reindex(index=facturas["Factura"], columns=modelo["productos"])
+        .fillna(0.0)
+    )
+    cantidad_total = mezcla.sum(axis=1).replace(0, 1)
+    lineas_por_factura = lineas.groupby("Factura", observed=True).size().reindex(facturas["Factura"]).fillna(0)
+
+    return np.column_stack([
+        np.log1p(montos.clip(lower=0)).to_numpy(),
+        desvio_proveedor.to_numpy(),
+        retraso_pago.to_numpy(dtype=float),
+        lineas_por_factura.to_numpy(dtype=float),
+        mezcla.div(cantidad_total, axis=0).to_numpy(),
+    ])
+
+
+def entrenar(facturas, lineas):
+    # Ajusta el modelo sobre el historial completo y guarda las estadísticas de referencia
+    estadisticas_proveedor, estadisticas_globales = _estadisticas_proveedor(facturas)
+    productos = list(lineas["Producto"].value_counts().index[:MAX_PRODUCTOS_MEZCLA])
+    modelo = {
+        "version": uuid.uuid4().hex,
+        "estadisticas_proveedor": estadisticas_proveedor,
+        "estadisticas_globales": estadisticas_globales,
+        "productos": productos,
+        "fecha_referencia": pd.Timestamp(date.today()),
+    }
+    bosque = IsolationForest(n_estimators=200, contamination="auto", random_state=0, n_jobs=-1)
+    bosque.fit(calcular_caracteristicas(facturas, lineas, modelo))
+    modelo["bosque"] = bosque
+    modelo["facturas_entrenamiento"] = len(facturas)
+    # Marca de la última fila puntuada; el candado evita puntuar dos veces desde sesiones concurrentes
+    modelo["ultima_fila"] = 0
+    modelo["candado"] = threading.Lock()
+    return modelo
+
+
+@st.cache_resource(show_spinner="Entrenando el modelo de anomalías...")
+def obtener_modelo():
+    # Se entrena una sola vez por proceso y se comparte entre sesiones y reejecuciones
+    return entrenar(almacen.listar_facturas(), almacen.listar_lineas())
+
+
+def _guardar_puntajes(modelo, facturas, lineas):
+    puntajes = modelo["bosque"].decision_function(calcular_caracteristicas(facturas, lineas, modelo))
+    almacen.guardar_puntajes(list(zip(
+        facturas["Factura"], [modelo["version"]] * len(facturas),
+        puntajes.astype(float), (puntajes < 0).astype(int).tolist(),
+    )))
+
+
+def puntuar_pendientes(modelo, tamano_lote=TAMANO_LOTE_PUNTAJE):
+    # Puntúa solo las facturas posteriores a la última fila puntuada (sin reentrenar) y las
+    # que perdieron su puntaje al modificarse en sitio, p. ej. al cambiar su estado de pago
+    puntuadas = 0
+    with modelo["candado"]:
+        while True:
+            facturas, lineas, ultima_fila = almacen.facturas_para_puntuar(modelo["ultima_fila"], tamano_lote)
+            if facturas.empty:
+                break
+            _guardar_puntajes(modelo, facturas, lineas)
+            modelo["ultima_fila"] = ultima_fila
+            puntuadas += len(facturas)
+
+        # El conteo evita recorrer las facturas cuando todas tienen puntaje de esta versión
+        while almacen.contar_puntajes(modelo["version"])[0] < almacen.contar_facturas():
+            facturas, lineas = almacen.facturas_sin_puntaje(modelo["version"], tamano_lote)
+            if facturas.empty:
+                break
+            _guardar_puntajes(modelo, facturas, lineas)
+            puntuadas += len(facturas)
+    return puntuadas
@@ -0,0 +1,206 @@
+"""Banco de pruebas de rendimiento del tablero.
+
+Ejecuta holman.py sin navegador con streamlit.testing.v1.AppTest sobre datos
+sintéticos de varios tamaños y escribe los tiempos en JSON:
+
+    python benchmarks/bench_holman.py --escalas 10 10000 1000000
+
+Cada escala corre en un proceso nuevo con su propio directorio de datos.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUTA_APP = os.path.join(RAIZ, "holman.py")
+TIEMPO_LIMITE = 1800
+INTERVALO_SONDEO_TRABAJOS = 0.1
+FACTURAS_RENDIMIENTO_PDF = 200
+ARCHIVOS_CFDI = 1000
+
+
+def _resumen(tiempos):
+    tiempos_ms = sorted(t * 1000 for t in tiempos)
+    return {
+        "mediana_ms": round(statistics.median(tiempos_ms), 2),
+        "p95_ms": round(tiempos_ms[min(len(tiempos_ms) - 1, int(0.95 * len(tiempos_ms)))], 2),
+        "min_ms": round(tiempos_ms[0], 2),
+        "repeticiones": len(tiempos_ms),
+    }
+
+
+def _ejecutar(at):
+    inicio = time.perf_counter()
+    at.run()
+    duracion = time.perf_counter() - inicio
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return duracion
+
+
+def _por_etiqueta(elementos, prefijo):
+    return next(elemento for elemento in elementos if elemento.label.startswith(prefijo))
+
+
+def medir_escala(num_facturas, repeticiones):
+    sys.path.insert(0, RAIZ)
+    from streamlit.testing.v1 import AppTest
+
+    import almacen
+    import cfdi
+    import datos
+    import reportes_pdf
+    from benchmarks import sinteticos
+
+    resultado = {"facturas": num_facturas}
+
+    inicio = time.perf_counter()
+    sinteticos.generar(num_facturas)
+    resultado["generacion_datos_s"] = round(time.perf_counter() - inicio, 2)
+
+    at = AppTest.from_file(RUTA_APP, default_timeout=TIEMPO_LIMITE)
+    resultado["arranque_en_frio_ms"] = round(_ejecutar(at) * 1000, 2)
+
+    # Selección de una factura: se escribe el número en el buscador y se elige la sugerencia
+    numero = almacen.numeros_factura()[num_facturas // 2] if num_facturas > 3 else "F001"
+    at.sidebar.radio[0].set_value("Factura Simulada")
+    _ejecutar(at)
+    tiempos_busqueda, tiempos = [], []
+    for _ in range(repeticiones):
+        _por_etiqueta(at.text_input, "Buscar factura").set_value(numero)
+        tiempos_busqueda.append(_ejecutar(at))
+        _por_etiqueta(at.selectbox, "Selecciona una factura").set_value(numero)
+        tiempos.append(_ejecutar(at))
+        _por_etiqueta(at.selectbox, "Selecciona una factura").set_value("")
+        _ejecutar(at)
+    resultado["busqueda_factura"] = _resumen(tiempos_busqueda)
+    resultado["seleccion_factura"] = _resumen(tiempos)
+    _por_etiqueta(at.selectbox, "Selecciona una factura").set_value(numero)
+    _ejecutar(at)
+
+    # Reejecución de cada pestaña (con la factura ya seleccionada): la primera visita y la mediana de las siguientes
+    resultado["pestanas"] = {}
+    for pestana in at.sidebar.radio[0].options:
+        at.sidebar.radio[0].set_value(pestana)
+        try:
+            primera = _ejecutar(at)
+            tiempos = [_ejecutar(at) for _ in range(repeticiones)]
+            resultado["pestanas"][pestana] = {"primera_visita_ms": round(primera * 1000, 2), **_resumen(tiempos)}
+        except Exception as error:
+            resultado["pestanas"][pestana] = {"error": str(error)}
+
+    # Reporte en la cola de trabajos: del clic hasta que su descarga aparece en el panel
+    at.sidebar.radio[0].set_value("Generar Reporte PDF")
+    _ejecutar(at)
+    inicio = time.perf_counter()
+    _por_etiqueta(at.button, "Generar Reporte PDF").click()
+    _ejecutar(at)
+    while not at.get("download_button") and time.perf_counter() - inicio < TIEMPO_LIMITE:
+        time.sleep(INTERVALO_SONDEO_TRABAJOS)
+        _ejecutar(at)
+    resultado["trabajo_reporte_s"] = round(time.perf_counter() - inicio, 2)
+
+    # Botones de PDF dentro de la aplicación. La factura se genera en el clic (los siguientes salen del
+    # caché); el reporte solo se envía a la cola de trabajos y los clics repetidos reutilizan el mismo trabajo.
+    for pestana, boton in (("Generar Factura", "Generar Factura PDF"), ("Generar Reporte PDF", "Generar Reporte PDF")):
+        at.sidebar.radio[0].set_value(pestana)
+        _ejecutar(at)
+        tiempos = []
+        for _ in range(repeticiones):
+            _por_etiqueta(at.button, boton).click()
+            tiempos.append(_ejecutar(at))
+        resultado[f"boton_{boton}"] = {"primer_clic_ms": round(tiempos[0] * 1000, 2), **_resumen(tiempos[1:] or tiempos)}
+
+    # Rendimiento directo de FPDF, sin caché
+    facturas = next(almacen.iterar_facturas(tamano_lote=FACTURAS_RENDIMIENTO_PDF))
+    inicio = time.perf_counter()
+    for factura in facturas:
+        reportes_pdf.renderizar_factura_pdf(factura)
+    duracion = time.perf_counter() - inicio
+    resultado["factura_pdf"] = {"facturas": len(facturas), "pdfs_por_segundo": round(len(facturas) / duracion, 1)}
+
+    factura = almacen.obtener_factura(numero)
+    datos_reporte = datos.cargar_datos_reporte(numero)
+    tiempos = []
+    for _ in range(max(1, repeticiones // 2)):
+        inicio = time.perf_counter()
+        reportes_pdf.pdf_a_bytes(reportes_pdf.construir_reporte_pdf(factura.to_dict(), **datos_reporte))
+        tiempos.append(time.perf_counter() - inicio)
+    resultado["reporte_pdf"] = _resumen(tiempos)
+
+    # Importación de CFDI: la primera lectura de la carpeta y la reimportación, que solo compara huellas
+    rutas = sinteticos.escribir_cfdi(os.path.join(almacen.DIRECTORIO_DATOS, "cfdi"), ARCHIVOS_CFDI)
+    archivos = [(os.path.basename(ruta), ruta) for ruta in rutas]
+    for medida in ("importacion_cfdi", "reimportacion_cfdi"):
+        resumen = cfdi.importar_cfdi(archivos)
+        resultado[medida] = {
+            "archivos": resumen["archivos"], "importadas": resumen["importadas"],
+            "segundos": round(resumen["segundos"], 2),
+            "archivos_por_segundo": round(resumen["archivos"] / resumen["segundos"], 1),
+        }
+
+    return resultado
+
+
+def _commit_actual():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escalas", type=int, nargs="+", default=[10, 10000, 1000000],
+                        help="número de facturas sintéticas de cada escala")
+    parser.add_argument("--repeticiones", type=int, default=5, help="reejecuciones medidas por operación")
+    parser.add_argument("--salida", help="archivo JSON de resultados (por omisión benchmarks/resultados/)")
+    parser.add_argument("--escala-interna", type=int, help=argparse.SUPPRESS)
+    argumentos = parser.parse_args()
+
+    if argumentos.escala_interna is not None:
+        json.dump(medir_escala(argumentos.escala_interna, argumentos.repeticiones), sys.stdout)
+        return
+
+    resultados = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit_actual(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "escalas": {},
+    }
+    for escala in argumentos.escalas:
+        print(f"Midiendo {escala:,} facturas...", file=sys.stderr)
+        with tempfile.TemporaryDirectory() as directorio:
+            proceso = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--escala-interna", str(escala),
+                 "--repeticiones", str(argumentos.repeticiones)],
+                cwd=RAIZ, env={**os.environ, "HOLMAN_DATA_DIR": directorio},
+                capture_output=True, text=True,
+            )
+        if proceso.returncode == 0:
+            resultados["escalas"][str(escala)] = json.loads(proceso.stdout)
+        else:
+            resultados["escalas"][str(escala)] = {"error": proceso.stderr.strip().splitlines()[-1:]}
+
+    salida = argumentos.salida or os.path.join(
+        RAIZ, "benchmarks", "resultados", f"bench_{datetime.now():%Y%m%d_%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+    with open(salida, "w", encoding="utf-8") as archivo:
+        json.dump(resultados, archivo, ensure_ascii=False, indent=2)
+    print(salida)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import os
+import uuid
+from xml.sax.saxutils import quoteattr
+
+import numpy as np
+
+import almacen
+
+PRODUCTOS = ["Materiales de construcción", "Mano de obra", "Equipos", "Materiales", "Acero", "Concreto", "Cimbra", "Herrería"]
+ESTADOS_PAGO = ["Pendiente", "Pagado"]
+TAMANO_LOTE = 50000
+
+# Comprobante CFDI 4.0 timbrado con lo mínimo que lee cfdi.leer_cfdi
+PLANTILLA_CFDI = """<?xml version="1.0" encoding="UTF-8"?>
+<cfdi:Comprobante xmlns:cfdi="http://www.sat.gob.mx/cfd/4" xmlns:tfd="http://www.sat.gob.mx/TimbreFiscalDigital"
+ Version="4.0" Serie="C" Folio="{folio}" Fecha="{fecha}T12:00:00" Total="{total:.2f}" Moneda="MXN"
+ TipoDeComprobante="I" MetodoPago="{metodo}">
+  <cfdi:Emisor Rfc="XAXX010101000" Nombre={emisor} RegimenFiscal="601"/>
+  <cfdi:Conceptos>{conceptos}
+  </cfdi:Conceptos>
+  <cfdi:Complemento>
+    <tfd:TimbreFiscalDigital Version="1.1" UUID="{uuid}" FechaTimbrado="{fecha}T12:05:00"/>
+  </cfdi:Complemento>
+</cfdi:Comprobante>
+"""
+
+
+def generar(num_facturas, semilla=0):
+    # Llena el almacén configurado (HOLMAN_DATA_DIR) con facturas, líneas, proyectos y actividades sintéticos
+    rng = np.random.default_rng(semilla)
+    num_proveedores = max(3, min(num_facturas // 50, 5000))
+    num_proyectos = max(3, min(num_facturas // 100, 2000))
+
+    with almacen.conectar() as conexion:
+        for inicio in range(0, num_facturas, TAMANO_LOTE):
+            n = min(TAMANO_LOTE, num_facturas - inicio)
+            proveedores = rng.integers(0, num_proveedores, n)
+            dias = rng.integers(0, 730, n)
+            fechas = (np.datetime64("2023-01-01") + dias).astype(str)
+            montos = np.round(rng.lognormal(12, 0.6, n) * (1 + proveedores % 7), 2)
+            estados = rng.integers(0, 2, n)
+            num_lineas = rng.integers(1, 6, n)
+
+            facturas, lineas = [], []
+            for i in range(n):
+                numero = f"S{inicio + i:08d}"
+                productos = rng.choice(len(PRODUCTOS), num_lineas[i], replace=False)
+                facturas.append((
+                    numero, fechas[i], f"Proveedor {proveedores[i]:05d}", float(montos[i]),
+                    ESTADOS_PAGO[estados[i]], ", ".join(PRODUCTOS[p] for p in productos),
+                ))
+                lineas.extend((numero, linea, PRODUCTOS[p], int(rng.integers(1, 20))) for linea, p in enumerate(productos, 1))
+            conexion.executemany("INSERT OR REPLACE INTO facturas VALUES (?, ?, ?, ?, ?, ?)", facturas)
+            conexion.executemany("INSERT OR REPLACE INTO lineas_factura VALUES (?, ?, ?, ?)", lineas)
+
+        conexion.executemany(
+            "INSERT OR IGNORE INTO catalogo_productos VALUES (?, ?)",
+            [(producto, float(rng.integers(5, 60)) * 1000) for producto in PRODUCTOS],
+        )
+
+        # Proyectos con la plantilla de actividades en secuencia
+        proyectos = range(len(almacen.PROYECTOS_INICIALES) + 1, num_proyectos + 1)
+        conexion.executemany(
+            "INSERT OR IGNORE INTO proyectos VALUES (?, ?, ?, ?)",
+            [(p, f"Proyecto {p:05d}", f"Responsable {p % 40}", ["Completado", "En Progreso", "Pendiente"][p % 3]) for p in proyectos],
+        )
+        # Obras repartidas dentro del territorio nacional
+        conexion.executemany(
+            "INSERT OR IGNORE INTO ubicaciones_proyecto VALUES (?, ?, ?)",
+            [(p, float(rng.uniform(15.0, 31.0)), float(rng.uniform(-115.0, -88.0))) for p in proyectos],
+        )
+        conexion.executemany(
+            "INSERT OR IGNORE INTO programas_obra VALUES (?, ?)",
+            [(p, str(np.datetime64("2024-01-01") + int(rng.integers(0, 365)))) for p in proyectos],
+        )
+        plantilla = almacen.ACTIVIDADES_PLANTILLA
+        conexion.executemany(
+            "INSERT OR IGNORE INTO actividades VALUES (?, ?, ?, ?, ?)",
+            [
+                ((p - 1) * len(plantilla) + orden, p, actividad, duracion,
+                 str((p - 1) * len(plantilla) + orden - 1) if orden > 1 else "")
+                for p in proyectos
+                for orden, (actividad, duracion) in enumerate(plantilla, 1)
+            ],
+        )
+        conexion.executemany(
+            "INSERT INTO eventos_avance (id_proyecto, progreso, documentos, estado, registrado) VALUES (?, ?, ?, ?, ?)",
+            [(p, int(rng.integers(0, 101)), "Planos", None, "2024-06-01T12:00:00") for p in proyectos],
+        )
+
+
+def escribir_cfdi(directorio, num_archivos, semilla=0):
+    # Escribe num_archivos XML de CFDI 4.0 sintéticos en el directorio y devuelve sus rutas
+    rng = np.random.default_rng(semilla)
+    os.makedirs(directorio, exist_ok=True)
+    rutas = []
+    for i in range(num_archivos):
+        productos = rng.choice(len(PRODUCTOS), int(rng.integers(1, 6)), replace=False)
+        cantidades = rng.integers(1, 20, len(productos))
+        precios = np.round(rng.lognormal(9, 0.5, len(productos)), 2)
+        conceptos = "".join(
+            f'\n    <cfdi:Concepto Cantidad="{cantidad}" Descripcion={quoteattr(PRODUCTOS[p])} '
+            f'ValorUnitario="{precio:.2f}" Importe="{cantidad * precio:.2f}"/>'
+            for p, cantidad, precio in zip(productos, cantidades, precios)
+        )
+        ruta = os.path.join(directorio, f"cfdi_{i:07d}.xml")
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            archivo.write(PLANTILLA_CFDI.format(
+                folio=i, fecha=np.datetime64("2024-01-01") + int(rng.integers(0, 365)),
+                total=float((cantidades * precios).sum()), metodo=["PUE", "PPD"][int(rng.integers(0, 2))],
+                emisor=quoteattr(f"Proveedor CFDI {int(rng.integers(0, 50)):03d}"), conceptos=conceptos,
+                uuid=uuid.UUID(bytes=rng.bytes(16), version=4),
+            ))
+        rutas.append(ruta)
+    return rutas
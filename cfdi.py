@@ -0,0 +1,173 @@
+import hashlib
+import os
+import time
+import xml.etree.ElementTree as ET
+from datetime import date
+from functools import partial
+from io import BytesIO
+
+import almacen
+import paralelo
+
+# Importación de facturas desde los XML de CFDI del SAT. Cada archivo se recorre con
+# iterparse: los atributos se leen al abrir cada nodo y el nodo se descarta al cerrarse,
+# así un comprobante con miles de conceptos o una addenda grande no se carga completo.
+# Los archivos se parsean por lotes en un pool de procesos y cada lote se guarda en
+# cuanto llega; los disparadores del almacén mantienen los resúmenes de cobranza.
+ESPACIOS_CFDI = {"http://www.sat.gob.mx/cfd/4", "http://www.sat.gob.mx/cfd/3"}
+ESPACIO_TIMBRE = "http://www.sat.gob.mx/TimbreFiscalDigital"
+# Pago en una sola exhibición: la factura nace pagada; en parcialidades o diferido queda pendiente
+METODOS_PAGO = {"PUE": "Pagado", "PPD": "Pendiente"}
+TIPO_INGRESO = "I"
+TAMANO_LOTE = 200
+TAMANO_BLOQUE_LECTURA = 1 << 20
+
+
+def _requerido(atributos, nombre, nodo):
+    valor = (atributos or {}).get(nombre)
+    if not valor:
+        raise ValueError(f"Falta el atributo {nombre} en {nodo}")
+    return valor
+
+
+def leer_cfdi(fuente):
+    # fuente: ruta del XML o su contenido en bytes. Devuelve la factura con los campos de
+    # almacen.guardar_cfdi (salvo "Huella Archivo") más "Tipo de Comprobante".
+    if isinstance(fuente, bytes):
+        fuente = BytesIO(fuente)
+    comprobante, emisor, uuid, conceptos = None, None, None, []
+    abiertos = []
+    for evento, nodo in ET.iterparse(fuente, events=("start", "end")):
+        if evento == "end":
+            # Cada nodo se suelta de su padre al cerrarse: en memoria solo queda la rama abierta
+            abiertos.pop()
+            if abiertos:
+                abiertos[-1].remove(nodo)
+            continue
+        abiertos.append(nodo)
+        espacio, _, nombre = nodo.tag.lstrip("{").rpartition("}")
+        if espacio in ESPACIOS_CFDI:
+            if nombre == "Comprobante":
+                comprobante = dict(nodo.attrib)
+            elif nombre == "Emisor":
+                emisor = dict(nodo.attrib)
+            elif nombre == "Concepto":
+                conceptos.append((
+                    _requerido(nodo.attrib, "Descripcion", nombre), float(_requerido(nodo.attrib, "Cantidad", nombre))
+                ))
+        elif espacio == ESPACIO_TIMBRE and nombre == "TimbreFiscalDigital":
+            uuid = _requerido(nodo.attrib, "UUID", nombre).upper()
+
+    if comprobante is None:
+        raise ValueError("No es un CFDI: falta el nodo Comprobante")
+    if uuid is None:
+        raise ValueError("El CFDI no está timbrado: falta el TimbreFiscalDigital")
+
+    # Los montos en otra moneda se convierten con el tipo de cambio del propio comprobante
+    monto = float(_requerido(comprobante, "Total", "Comprobante"))
+    if comprobante.get("Moneda", "MXN") not in ("MXN", "XXX"):
+        monto *= float(_requerido(comprobante, "TipoCambio", "Comprobante"))
+    folio = comprobante.get("Folio")
+    return {
+        "Factura": f"{comprobante.get('Serie', '')}{folio}" if folio else uuid,
+        "Fecha": date.fromisoformat(_requerido(comprobante, "Fecha", "Comprobante")[:10]).isoformat(),
+        "Proveedor": (emisor or {}).get("Nombre") or _requerido(emisor, "Rfc", "Emisor"),
+        "Monto Total (MXN)": round(monto, 2),
+        "Estado de Pago": METODOS_PAGO.get(comprobante.get("MetodoPago"), "Pendiente"),
+        "Productos": ", ".join(dict.fromkeys(descripcion for descripcion, _ in conceptos)),
+        "Líneas": conceptos,
+        "UUID": uuid,
+        "Tipo de Comprobante": _requerido(comprobante, "TipoDeComprobante", "Comprobante"),
+    }
+
+
+def huella_archivo(fuente):
+    # SHA-256 del contenido: un archivo ya importado se reconoce sin parsearlo
+    huella = hashlib.sha256()
+    if isinstance(fuente, bytes):
+        huella.update(fuente)
+    else:
+        with open(fuente, "rb") as archivo:
+            for bloque in iter(partial(archivo.read, TAMANO_BLOQUE_LECTURA), b""):
+                huella.update(bloque)
+    return huella.hexdigest()
+
+
+def archivos_carpeta(carpeta):
+    # (nombre, ruta) de los XML de la carpeta y sus subcarpetas, en orden estable
+    return [
+        (os.path.relpath(os.path.join(raiz, nombre), carpeta), os.path.join(raiz, nombre))
+        for raiz, subcarpetas, nombres in sorted(os.walk(carpeta))
+        for nombre in sorted(nombres)
+        if nombre.lower().endswith(".xml")
+    ]
+
+
+def _leer_lote(lote):
+    # Se ejecuta en un proceso trabajador; un archivo dañado no detiene al resto del lote
+    resultados = []
+    for nombre, fuente, huella in lote:
+        try:
+            resultados.append((nombre, huella, leer_cfdi(fuente), None))
+        except (ET.ParseError, ValueError, OSError) as error:
+            resultados.append((nombre, huella, None, f"{type(error).__name__}: {error}"))
+    return resultados
+
+
+def importar_cfdi(archivos, al_avanzar=None, procesos=None):
+    # archivos: [(nombre, fuente)] con la ruta o el contenido de cada XML. Se saltan los archivos
+    # con una huella ya registrada y los comprobantes con un UUID ya importado.
+    resumen = {"archivos": len(archivos), "importadas": 0, "repetidas": 0, "omitidas": 0, "errores": []}
+    procesados = 0
+    inicio = time.perf_counter()
+    uuids_vistos, numeros_vistos = set(), set()
+
+    def lotes():
+        nonlocal procesados
+        for desde in range(0, len(archivos), TAMANO_LOTE):
+            bloque, lote = archivos[desde:desde + TAMANO_LOTE], []
+            for nombre, fuente in bloque:
+                try:
+                    lote.append((nombre, fuente, huella_archivo(fuente)))
+                except OSError as error:
+                    resumen["errores"].append((nombre, f"{type(error).__name__}: {error}"))
+            conocidas = almacen.huellas_cfdi_ingeridas([huella for _, _, huella in lote])
+            nuevos = [archivo for archivo in lote if archivo[2] not in conocidas]
+            resumen["repetidas"] += len(lote) - len(nuevos)
+            procesados += len(bloque) - len(nuevos)
+            yield nuevos
+
+    def guardar(resultados):
+        nonlocal procesados
+        procesados += len(resultados)
+        leidos = [(huella, factura) for _, huella, factura, _ in resultados if factura]
+        resumen["errores"].extend((nombre, error) for nombre, _, _, error in resultados if error)
+        ya_importados = almacen.uuids_cfdi_ingeridos([factura["UUID"] for _, factura in leidos])
+        nuevas, omitidos = [], []
+        for huella, factura in leidos:
+            if factura["UUID"] in ya_importados or factura["UUID"] in uuids_vistos:
+                resumen["repetidas"] += 1
+                continue
+            uuids_vistos.add(factura["UUID"])
+            if factura["Tipo de Comprobante"] != TIPO_INGRESO:
+                omitidos.append((factura["UUID"], huella))
+                continue
+            nuevas.append({**factura, "Huella Archivo": huella})
+        # Serie y folio solo son únicos por emisor: si el número ya está ocupado, la factura usa su UUID
+        ocupados = almacen.facturas_existentes([factura["Factura"] for factura in nuevas]) | numeros_vistos
+        for factura in nuevas:
+            if factura["Factura"] in ocupados:
+                factura["Factura"] = factura["UUID"]
+            numeros_vistos.add(factura["Factura"])
+        if nuevas or omitidos:
+            almacen.guardar_cfdi(nuevas, omitidos)
+        resumen["importadas"] += len(nuevas)
+        resumen["omitidas"] += len(omitidos)
+        if al_avanzar:
+            al_avanzar(procesados, len(archivos), time.perf_counter() - inicio)
+
+    # Con un solo lote no compensa arrancar procesos
+    paralelo.procesar_lotes(lotes(), _leer_lote, guardar, 1 if len(archivos) <= TAMANO_LOTE else procesos)
+
+    resumen["segundos"] = time.perf_counter() - inicio
+    return resumen
@@ -0,0 +1,139 @@
+import streamlit as st
+
+import almacen
+import cfdi
+import programacion
+
+# Capa de acceso a datos compartida por todas las sesiones del proceso.
+# Los cargadores se cachean una sola vez por proceso (no por sesión) y se
+# invalidan explícitamente con invalidar_datos() cuando cambian los datos;
+# el TTL cubre cambios hechos por fuera de la aplicación.
+TTL_DATOS = 600
+
+
+# Las facturas nunca se cargan completas: se cuentan y se leen por páginas
+@st.cache_data(ttl=TTL_DATOS, max_entries=256, show_spinner=False)
+def contar_facturas(**filtros):
+    return almacen.contar_facturas(**filtros)
+
+
+@st.cache_data(ttl=TTL_DATOS, max_entries=256, show_spinner=False)
+def pagina_facturas(orden, descendente, desplazamiento, limite, **filtros):
+    return almacen.paginar_facturas(orden, descendente, desplazamiento, limite, **filtros)
+
+
+@st.cache_data(ttl=TTL_DATOS, show_spinner=False)
+def cargar_proveedores():
+    return almacen.listar_proveedores()
+
+
+@st.cache_data(ttl=TTL_DATOS, show_spinner=False)
+def cargar_productos():
+    return almacen.listar_productos()
+
+
+@st.cache_data(ttl=TTL_DATOS, show_spinner=False)
+def cargar_levantamiento():
+    return almacen.listar_levantamiento()
+
+
+@st.cache_data(ttl=TTL_DATOS, show_spinner=False)
+def cargar_cronograma():
+    # Programa calculado por ruta crítica a partir de duraciones y predecesoras
+    return programacion.programar_obra(almacen.listar_actividades())
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def _cargar_ejecucion(version):
+    return almacen.listar_ejecucion()
+
+
+def cargar_ejecucion():
+    # Incorpora los eventos nuevos de la bitácora y usa la marca de lectura como versión del caché
+    return _cargar_ejecucion(almacen.plegar_eventos_avance())
+
+
+def registrar_avance(id_proyecto, progreso, documentos="", estado=None):
+    almacen.registrar_avance(id_proyecto, progreso, documentos, estado)
+
+
+TASA_IVA = 0.16
+
+
+@st.cache_data(ttl=TTL_DATOS, show_spinner=False)
+def cargar_catalogo():
+    # Índice producto -> costo unitario
+    return almacen.listar_catalogo().set_index("Producto")["Costo Unitario (MXN)"]
+
+
+@st.cache_data(ttl=TTL_DATOS, max_entries=256, show_spinner=False)
+def cargar_lineas_factura(numero_factura):
+    df_lineas = almacen.listar_lineas_factura(numero_factura)
+    df_lineas["Producto"] = df_lineas["Producto"].astype("category")
+    return df_lineas
+
+
+def construir_cotizacion(numero_factura, descuento_pct=0.0):
+    # Costos del catálogo y totales calculados como operaciones de columna
+    df_cotizacion = cargar_lineas_factura(numero_factura)
+    df_cotizacion.insert(
+        2, "Costo Unitario (MXN)", df_cotizacion["Producto"].map(cargar_catalogo()).astype(float)
+    )
+    df_cotizacion["Costo Total (MXN)"] = df_cotizacion["Costo Unitario (MXN)"] * df_cotizacion["Cantidad"]
+    df_cotizacion["Descuento (MXN)"] = df_cotizacion["Costo Total (MXN)"] * (descuento_pct / 100)
+    df_cotizacion["IVA (MXN)"] = (df_cotizacion["Costo Total (MXN)"] - df_cotizacion["Descuento (MXN)"]) * TASA_IVA
+    df_cotizacion["Total con IVA (MXN)"] = (
+        df_cotizacion["Costo Total (MXN)"] - df_cotizacion["Descuento (MXN)"] + df_cotizacion["IVA (MXN)"]
+    )
+    return df_cotizacion
+
+
+COSTO_DIARIO_PREDETERMINADO = 5000
+
+
+def cargar_datos_reporte(numero_factura=None, costo_diario=COSTO_DIARIO_PREDETERMINADO):
+    # Reúne los datos de todas las etapas para el reporte desde la misma fuente que las pestañas
+    cronograma_df = cargar_cronograma()
+    cronograma_df["Inicio Estimado"] = cronograma_df["Inicio Estimado"].dt.strftime("%Y-%m-%d")
+    cronograma_df["Fin Estimado"] = cronograma_df["Fin Estimado"].dt.strftime("%Y-%m-%d")
+    cronograma_df["Costo Estimado (MXN)"] = cronograma_df["Duración (días)"] * costo_diario
+    return {
+        "df_levantamiento": cargar_levantamiento(),
+        "df_cotizacion": construir_cotizacion(numero_factura) if numero_factura else None,
+        "cronograma_df": cronograma_df,
+        "df_ejecucion": cargar_ejecucion(),
+    }
+
+
+CARGADORES = (
+    contar_facturas, pagina_facturas, cargar_proveedores, cargar_levantamiento, cargar_cronograma,
+    _cargar_ejecucion, cargar_catalogo, cargar_lineas_factura, cargar_productos,
+)
+
+
+def obtener_factura_detalle():
+    # Todas las pestañas resuelven la factura seleccionada contra el mismo almacén
+    return almacen.obtener_factura(st.session_state.get("factura_seleccionada"))
+
+
+def invalidar_datos():
+    # Descarta lo cacheado para que la siguiente lectura vuelva al almacén
+    for cargador in CARGADORES:
+        cargador.clear()
+
+
+def actualizar_actividades(actividades):
+    almacen.actualizar_actividades(actividades)
+    invalidar_datos()
+
+
+def importar_cfdi(archivos, al_avanzar=None):
+    resumen = cfdi.importar_cfdi(archivos, al_avanzar)
+    if resumen["importadas"]:
+        invalidar_datos()
+    return resumen
+
+
+def actualizar_estado_pago(numeros, estado):
+    almacen.actualizar_estado_pago(numeros, estado)
+    invalidar_datos()
@@ -0,0 +1,56 @@
+import csv
+import io
+import time
+import zipfile
+
+import paralelo
+import reportes_pdf
+
+
+def _renderizar_lote(facturas):
+    # Se ejecuta en un proceso trabajador con el mismo diseño FPDF de la factura individual.
+    # Una factura que no se puede renderizar queda registrada sin detener al resto del lote.
+    resultados = []
+    for factura in facturas:
+        try:
+            resultados.append((factura["Factura"], reportes_pdf.renderizar_factura_pdf(factura), None))
+        except Exception as error:
+            resultados.append((factura["Factura"], None, f"{type(error).__name__}: {error}"))
+    return resultados
+
+
+def exportar_facturas_zip(lotes, ruta_zip, total=None, al_avanzar=None, procesos=None, ejecutor=None):
+    # Renderiza los lotes de facturas en paralelo y escribe cada PDF en el ZIP
+    # en cuanto llega. Con ejecutor se usa ese pool de procesos (p. ej. el de la cola de trabajos).
+    procesadas = 0
+    errores = []
+    inicio = time.perf_counter()
+
+    with zipfile.ZipFile(ruta_zip, "w", compression=zipfile.ZIP_STORED) as archivo_zip:
+        def escribir(resultados):
+            nonlocal procesadas
+            # Los PDFs ya vienen comprimidos por FPDF, así que se almacenan sin recomprimir
+            for numero, contenido, error in resultados:
+                if error:
+                    errores.append((numero, error))
+                else:
+                    archivo_zip.writestr(f"factura_{numero}.pdf", contenido)
+                procesadas += 1
+            if al_avanzar:
+                al_avanzar(procesadas, total, time.perf_counter() - inicio)
+
+        paralelo.procesar_lotes(lotes, _renderizar_lote, escribir, procesos, ejecutor)
+
+        # Las facturas sin PDF se listan dentro del mismo ZIP
+        if errores:
+            salida = io.StringIO()
+            csv.writer(salida).writerows([("Factura", "Error"), *errores])
+            archivo_zip.writestr("errores.csv", salida.getvalue())
+
+    duracion = time.perf_counter() - inicio
+    return {
+        "facturas": procesadas - len(errores),
+        "errores": errores,
+        "segundos": duracion,
+        "pdfs_por_segundo": procesadas / duracion if duracion > 0 else 0.0,
+    }
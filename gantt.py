@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+# Límite de barras que se dibujan en una figura, sin importar el tamaño del programa
+MAX_BARRAS = 400
+PALETA = px.colors.qualitative.Plotly
+MS_POR_DIA = 24 * 60 * 60 * 1000
+
+
+def filtrar_rango(programa, desde, hasta):
+    # Conserva solo las actividades que se traslapan con el rango visible
+    desde, hasta = pd.Timestamp(desde), pd.Timestamp(hasta)
+    visibles = (programa["Inicio Estimado"] <= hasta) & (programa["Fin Estimado"] >= desde)
+    return programa[visibles]
+
+
+def filas_gantt(programa, agrupar_por, expandidos=(), max_barras=MAX_BARRAS):
+    # Un renglón resumen por grupo colapsado y un renglón por actividad en los grupos expandidos
+    en_detalle = programa[agrupar_por].isin(list(expandidos))
+
+    resumen = (
+        programa[~en_detalle]
+        .groupby(agrupar_por, observed=True, sort=False)
+        .agg(
+            inicio=("Inicio Estimado", "min"),
+            fin=("Fin Estimado", "max"),
+            actividades=("Actividad", "size"),
+            criticas=("Ruta Crítica", "sum"),
+        )
+        .reset_index()
+    )
+    resumen = pd.DataFrame({
+        "Etiqueta": "▸ " + resumen[agrupar_por].astype(str) + " (" + resumen["actividades"].astype(str) + ")",
+        "Grupo": resumen[agrupar_por],
+        "Inicio": resumen["inicio"],
+        "Fin": resumen["fin"],
+        "Ruta Crítica": resumen["criticas"] > 0,
+        "Detalle": resumen["actividades"].astype(str) + " actividades",
+    })
+
+    detalle = programa[en_detalle]
+    omitidas = 0
+    if len(detalle) > max_barras:
+        # Submuestreo: primero la ruta crítica y luego las actividades más largas
+        omitidas = len(detalle) - max_barras
+        detalle = detalle.sort_values(["Ruta Crítica", "Duración (días)"], ascending=False).head(max_barras)
+    detalle = pd.DataFrame({
+        "Etiqueta": detalle[agrupar_por].astype(str) + " · " + detalle["Actividad"].astype(str)
+                    + " #" + detalle["ID Actividad"].astype(str),
+        "Grupo": detalle[agrupar_por],
+        "Inicio": detalle["Inicio Estimado"],
+        "Fin": detalle["Fin Estimado"],
+        "Ruta Crítica": detalle["Ruta Crítica"],
+        "Detalle": "Holgura: " + detalle["Holgura (días)"].astype(str) + " días",
+    })
+
+    filas = pd.concat([resumen, detalle], ignore_index=True).sort_values("Inicio", kind="stable")
+    return filas.head(max_barras), omitidas + max(len(filas) - max_barras, 0)
+
+
+def figura_gantt(filas, color_por="Grupo", titulo="Cronograma de Obra"):
+    # Una sola traza de barras horizontales con color categórico por renglón
+    if color_por == "Ruta Crítica":
+        colores = np.where(filas["Ruta Crítica"], "crimson", "steelblue")
+    else:
+        codigos, _ = pd.factorize(filas["Grupo"])
+        colores = np.asarray(PALETA, dtype=object)[codigos % len(PALETA)]
+
+    # El fin es inclusivo: la barra cubre hasta el final de ese día
+    duracion_ms = (filas["Fin"] - filas["Inicio"]).dt.days.to_numpy() * MS_POR_DIA + MS_POR_DIA
+    figura = go.Figure(go.Bar(
+        base=filas["Inicio"],
+        x=duracion_ms,
+        y=filas["Etiqueta"],
+        orientation="h",
+        marker_color=colores,
+        customdata=np.column_stack([
+            filas["Inicio"].dt.strftime("%Y-%m-%d"), filas["Fin"].dt.strftime("%Y-%m-%d"), filas["Detalle"],
+        ]),
+        hovertemplate="<b>%{y}</b><br>Inicio: %{customdata[0]}<br>Fin: %{customdata[1]}<br>%{customdata[2]}<extra></extra>",
+    ))
+    figura.update_layout(
+        title=titulo,
+        xaxis_type="date",
+        yaxis=dict(autorange="reversed", title="Tareas"),
+        height=max(350, min(22 * len(filas), 1600)),
+        showlegend=False,
+    )
+    return figura
+
+
+def figura_costos(programa, agrupar_por="Actividad", max_barras=40, titulo="Costo Estimado por Actividad"):
+    # Costos agregados por categoría en una sola traza; el resto se acumula en "Otras"
+    costos = (
+        programa.groupby(agrupar_por, observed=True)["Costo Estimado (MXN)"].sum().sort_values(ascending=False)
+    )
+    if len(costos) > max_barras:
+        costos = pd.concat([costos.head(max_barras - 1), pd.Series({"Otras": costos.iloc[max_barras - 1:].sum()})])
+    codigos = np.arange(len(costos)) % len(PALETA)
+    figura = go.Figure(go.Bar(
+        x=costos.index.astype(str),
+        y=costos.to_numpy(),
+        marker_color=np.asarray(PALETA, dtype=object)[codigos],
+        texttemplate="%{y:,.0f}",
+    ))
+    figura.update_layout(title=titulo, xaxis_title=agrupar_por, yaxis_title="Costo Estimado (MXN)", showlegend=False)
+    return figura
@@ -0,0 +1,82 @@
+import html
+import json
+
+import folium
+import streamlit as st
+from folium.plugins import FastMarkerCluster
+
+import almacen
+
+# Mapa de obras con agrupación de marcadores en el navegador. Los sitios viajan
+# como un arreglo de datos y el agrupador crea cada marcador bajo demanda, así
+# que miles de obras no generan miles de objetos en el HTML.
+COLORES_ESTADO = {"Finalizado": "green", "En Progreso": "orange", "Retrasado": "red", "Sin registro": "gray"}
+CENTRO_MEXICO = (23.6, -102.5)
+
+ESTADOS = list(COLORES_ESTADO)
+
+# fila = [latitud, longitud, índice de estado, nombre, responsable, progreso]; el globo se arma en el navegador
+MARCADOR_JS = """
+function (fila) {
+    var estados = %s, colores = %s;
+    var marcador = L.circleMarker(new L.LatLng(fila[0], fila[1]), {
+        radius: 7, color: colores[fila[2]], fillColor: colores[fila[2]], fillOpacity: 0.85, weight: 1
+    });
+    marcador.bindPopup(
+        "<b>" + fila[3] + "</b><br>Responsable: " + fila[4] + "<br>Progreso: " + fila[5] + "%%<br>Estado: " + estados[fila[2]]
+    );
+    return marcador;
+}
+""" % (json.dumps(ESTADOS, ensure_ascii=False), json.dumps(list(COLORES_ESTADO.values())))
+
+
+def _leyenda():
+    renglones = "".join(
+        f'<div><span style="display:inline-block;width:10px;height:10px;border-radius:50%;'
+        f'background:{color};margin-right:6px"></span>{estado}</div>'
+        for estado, color in COLORES_ESTADO.items()
+    )
+    return folium.Element(
+        '<div style="position:fixed;bottom:24px;left:24px;z-index:9999;background:white;'
+        f'padding:8px 10px;border-radius:4px;font:12px sans-serif;box-shadow:0 0 4px #999">{renglones}</div>'
+    )
+
+
+def mapa_sitios(sitios):
+    # Devuelve el HTML completo del mapa para incrustarlo en la página
+    mapa = folium.Map(location=CENTRO_MEXICO, zoom_start=5, prefer_canvas=True)
+    codigos = sitios["Estado General"].map({estado: i for i, estado in enumerate(ESTADOS)}).fillna(ESTADOS.index("Sin registro"))
+    filas = zip(
+        sitios["Latitud"].round(5).tolist(), sitios["Longitud"].round(5).tolist(), codigos.astype(int).tolist(),
+        sitios["Nombre Proyecto"].map(html.escape).tolist(), sitios["Responsable"].map(html.escape).tolist(),
+        sitios["Progreso (%)"].astype(int).tolist(),
+    )
+    FastMarkerCluster(
+        [list(fila) for fila in filas], callback=MARCADOR_JS,
+        options={"chunkedLoading": True, "maxClusterRadius": 50, "disableClusteringAtZoom": 12},
+    ).add_to(mapa)
+    if len(sitios):
+        mapa.fit_bounds([
+            [sitios["Latitud"].min(), sitios["Longitud"].min()], [sitios["Latitud"].max(), sitios["Longitud"].max()]
+        ])
+    mapa.get_root().html.add_child(_leyenda())
+    return mapa.get_root().render()
+
+
+def version_sitios():
+    # Cambia con cada avance de obra nuevo y con cualquier cambio en proyectos o ubicaciones
+    return almacen.plegar_eventos_avance(), almacen.version_sitios()
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def cargar_sitios(version):
+    return almacen.listar_sitios()
+
+
+@st.cache_data(max_entries=8, show_spinner="Generando el mapa de obras...")
+def html_mapa_sitios(version, estados=()):
+    # El HTML se reconstruye solo con una versión de datos o un filtro distintos
+    sitios = cargar_sitios(version)
+    if estados:
+        sitios = sitios[sitios["Estado General"].isin(list(estados))]
+    return mapa_sitios(sitios)
@@ -0,0 +1,139 @@
+import io
+import json
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+import streamlit as st
+
+# Instrumentación de rutas críticas. Con el panel de depuración apagado, medir()
+# devuelve un contexto vacío y no registra nada.
+ARCHIVO_METRICAS = "metricas.jsonl"
+CLAVE_PANEL = "panel_depuracion"
+CLAVE_TRAMOS = "_tramos_medidos"
+CLAVE_EJECUCION_COMPLETA = "_ejecucion_completa"
+MAX_REGISTROS_RESUMEN = 20000
+# Al pasar de este tamaño el archivo se recorta a su mitad más reciente
+MAX_BYTES_METRICAS = 4 * 1024 * 1024
+# Cola del archivo que lee el resumen (de sobra para MAX_REGISTROS_RESUMEN registros)
+BYTES_RESUMEN = 2 * 1024 * 1024
+
+_SIN_MEDICION = nullcontext()
+
+
+def activo():
+    return st.session_state.get(CLAVE_PANEL, False)
+
+
+@contextmanager
+def _medir(nombre):
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        st.session_state.setdefault(CLAVE_TRAMOS, []).append((nombre, (time.perf_counter() - inicio) * 1000))
+
+
+def medir(nombre):
+    # Uso: with metricas.medir("plotly:gantt"): ...
+    if not activo():
+        return _SIN_MEDICION
+    return _medir(nombre)
+
+
+def iniciar_ejecucion():
+    if activo():
+        st.session_state[CLAVE_TRAMOS] = []
+        st.session_state[CLAVE_EJECUCION_COMPLETA] = True
+
+
+@contextmanager
+def _medir_fragmento(nombre):
+    # En una ejecución completa los tramos del fragmento se suman a los de la página. Cuando el
+    # fragmento se reejecuta solo, mostrar_panel no corre: sus tramos se guardan aquí mismo.
+    completa = st.session_state.get(CLAVE_EJECUCION_COMPLETA, False)
+    if not completa:
+        st.session_state[CLAVE_TRAMOS] = []
+    with _medir(nombre):
+        yield
+    if not completa:
+        _volcar(st.session_state[CLAVE_TRAMOS])
+
+
+def medir_fragmento(nombre):
+    # Uso: dentro de una función @st.fragment, with metricas.medir_fragmento("fragmento:avance"): ...
+    if not activo():
+        return _SIN_MEDICION
+    return _medir_fragmento(nombre)
+
+
+def ruta_metricas():
+    # almacen (y pandas) solo se importan con el panel encendido
+    import almacen
+
+    return os.path.join(almacen.DIRECTORIO_DATOS, ARCHIVO_METRICAS)
+
+
+def _cola(ruta, max_bytes):
+    # Últimas líneas completas del archivo, sin leerlo entero
+    with open(ruta, "rb") as archivo:
+        tamano = archivo.seek(0, os.SEEK_END)
+        archivo.seek(max(tamano - max_bytes, 0))
+        contenido = archivo.read()
+    if tamano > max_bytes:
+        contenido = contenido[contenido.find(b"\n") + 1:]
+    return contenido
+
+
+def _volcar(tramos):
+    # Una sola escritura por ejecución con todos sus tramos
+    ruta = ruta_metricas()
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    marca = datetime.now().isoformat(timespec="seconds")
+    with open(ruta, "a", encoding="utf-8") as archivo:
+        archivo.writelines(
+            json.dumps({"tramo": nombre, "ms": round(ms, 3), "fecha": marca}, ensure_ascii=False) + "\n"
+            for nombre, ms in tramos
+        )
+        excedido = archivo.tell() > MAX_BYTES_METRICAS
+    if excedido:
+        # Se reescribe aparte y se reemplaza de un golpe; el archivo nunca crece sin límite
+        temporal = ruta + ".tmp"
+        with open(temporal, "wb") as archivo:
+            archivo.write(_cola(ruta, MAX_BYTES_METRICAS // 2))
+        os.replace(temporal, ruta)
+
+
+def resumen_metricas():
+    # p50/p95 por tramo sobre los registros más recientes del archivo de métricas
+    import pandas as pd
+
+    ruta = ruta_metricas()
+    contenido = _cola(ruta, BYTES_RESUMEN) if os.path.exists(ruta) else b""
+    if not contenido.strip():
+        return pd.DataFrame(columns=["Tramo", "Muestras", "p50 (ms)", "p95 (ms)"])
+    registros = pd.read_json(io.BytesIO(contenido), lines=True).tail(MAX_REGISTROS_RESUMEN)
+    agrupado = registros.groupby("tramo")["ms"]
+    return pd.DataFrame({
+        "Muestras": agrupado.size(),
+        "p50 (ms)": agrupado.quantile(0.5).round(2),
+        "p95 (ms)": agrupado.quantile(0.95).round(2),
+    }).rename_axis("Tramo").reset_index().sort_values("p95 (ms)", ascending=False)
+
+
+def mostrar_panel():
+    # Se llama al final de la ejecución: guarda los tramos y los muestra en la barra lateral
+    if not activo():
+        return
+    tramos = st.session_state.get(CLAVE_TRAMOS, [])
+    if tramos:
+        _volcar(tramos)
+    # Desde aquí hasta la siguiente ejecución completa, los fragmentos guardan sus propios tramos
+    st.session_state[CLAVE_EJECUCION_COMPLETA] = False
+
+    with st.sidebar.expander("⏱️ Tiempos de esta ejecución", expanded=True):
+        for nombre, ms in tramos:
+            st.text(f"{ms:9.1f} ms  {nombre}")
+    with st.sidebar.expander("📈 Percentiles por tramo"):
+        st.dataframe(resumen_metricas(), hide_index=True, use_container_width=True)
@@ -0,0 +1,16 @@
+# Cada etapa del tablero es un módulo con una función mostrar(). Los módulos se
+# importan solo cuando se abre su pestaña, junto con sus dependencias pesadas
+# (plotly, fpdf, folium, el motor de programación, etc.).
+PAGINAS = {
+    "Inicio": "paginas.inicio",
+    "Factura Simulada": "paginas.facturas",
+    "Etapa 1: Levantamiento": "paginas.levantamiento",
+    "Etapa 2: Cotización": "paginas.cotizacion",
+    "Etapa 3: Programación de Obra": "paginas.programacion_obra",
+    "Etapa 4: Ejecución y Monitoreo": "paginas.ejecucion",
+    "Mapa de Obras": "paginas.mapa",
+    "Pago de la Obra": "paginas.pago",
+    "Análisis de Anomalías": "paginas.anomalias",
+    "Generar Factura": "paginas.generar_factura",
+    "Generar Reporte PDF": "paginas.generar_reporte",
+}
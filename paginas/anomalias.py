@@ -0,0 +1,41 @@
+import streamlit as st
+
+import almacen
+import anomalias
+import metricas
+
+
+# --------------------- Análisis de Anomalías ---------------------
+def mostrar():
+    st.subheader("Análisis de Anomalías en Facturas")
+    st.markdown(
+        "Cada factura se evalúa contra el historial de su proveedor, su retraso de pago y su mezcla de productos. "
+        "El modelo se entrena una sola vez y las facturas nuevas solo se puntúan."
+    )
+
+    modelo = anomalias.obtener_modelo()
+
+    # Puntaje incremental: solo las facturas que aún no se han evaluado con este modelo
+    with metricas.medir("anomalias:puntuar_pendientes"):
+        nuevas = anomalias.puntuar_pendientes(modelo)
+    if nuevas:
+        st.info(f"Se puntuaron {nuevas:,} factura(s) nueva(s).")
+
+    total_puntuadas, total_anomalas = almacen.contar_puntajes(modelo["version"])
+    col_entrenamiento, col_puntuadas, col_anomalas = st.columns(3)
+    col_entrenamiento.metric("Facturas de entrenamiento", f"{modelo['facturas_entrenamiento']:,}")
+    col_puntuadas.metric("Facturas evaluadas", f"{total_puntuadas:,}")
+    col_anomalas.metric("Facturas anómalas", f"{total_anomalas:,}")
+
+    solo_anomalas = st.toggle("Mostrar solo facturas anómalas", value=True)
+    limite = st.number_input("Número de facturas a mostrar", min_value=10, max_value=5000, value=100, step=10)
+    with metricas.medir("almacen:listar_anomalias"):
+        df_anomalias = almacen.listar_anomalias(modelo["version"], int(limite), solo_anomalas)
+
+    st.markdown("### Facturas más atípicas")
+    st.caption("Un puntaje más bajo indica una factura más atípica; los valores negativos se consideran anomalías.")
+    st.dataframe(df_anomalias, use_container_width=True, hide_index=True)
+
+    if st.button("Reentrenar modelo con el historial completo"):
+        anomalias.obtener_modelo.clear()
+        st.rerun()
@@ -0,0 +1,46 @@
+import streamlit as st
+
+import datos
+import metricas
+import tablas
+
+
+# --------------------- Etapa 2: Cotización ---------------------
+def mostrar():
+    st.subheader("Etapa 2: Cotización")
+    st.markdown("En esta etapa se genera la cotización automática basada en los productos de la factura seleccionada.")
+
+    # Validar si hay una factura seleccionada
+    factura_detalle = datos.obtener_factura_detalle()
+    if factura_detalle is None:
+        st.error("Por favor, selecciona una factura válida en la sección 'Factura Simulada' para generar la cotización.")
+        df_cotizacion = None
+    else:
+        descuento_pct = st.number_input("Descuento (%)", min_value=0.0, max_value=100.0, value=0.0, step=1.0)
+        with metricas.medir("pandas:construir_cotizacion"):
+            df_cotizacion = datos.construir_cotizacion(factura_detalle["Factura"], descuento_pct)
+
+    if df_cotizacion is not None and not df_cotizacion.empty:
+        sin_precio = df_cotizacion["Costo Unitario (MXN)"].isna()
+        if sin_precio.any():
+            st.warning(
+                f"{sin_precio.sum():,} línea(s) con productos fuera del catálogo de precios: "
+                + ", ".join(df_cotizacion.loc[sin_precio, "Producto"].unique()[:10])
+            )
+
+        st.markdown("### Cotización Detallada")
+        with metricas.medir("dataframe:cotizacion"):
+            tablas.tabla_dataframe("cotizacion", df_cotizacion)
+
+        # Mostrar costos totales
+        subtotal, descuento, iva, total = df_cotizacion[
+            ["Costo Total (MXN)", "Descuento (MXN)", "IVA (MXN)", "Total con IVA (MXN)"]
+        ].sum()
+        col_subtotal, col_descuento, col_iva, col_total = st.columns(4)
+        col_subtotal.metric("Subtotal", f"MXN {subtotal:,.2f}")
+        col_descuento.metric("Descuento", f"MXN {descuento:,.2f}")
+        col_iva.metric(f"IVA ({datos.TASA_IVA:.0%})", f"MXN {iva:,.2f}")
+        col_total.metric("Total", f"MXN {total:,.2f}")
+        st.markdown(f"### Costo Total de la Cotización: **MXN {total:,.2f}**")
+    elif df_cotizacion is not None:
+        st.warning("No se encontraron productos relacionados en la factura seleccionada.")
@@ -0,0 +1,74 @@
+import streamlit as st
+import plotly.express as px
+
+import datos
+import metricas
+import tablas
+
+# Intervalo de actualización del avance de obra (segundos)
+INTERVALO_AVANCE = 15
+
+
+# --------------------- Etapa 4: Ejecución y Monitoreo ---------------------
+def mostrar():
+    st.subheader("Etapa 4: Ejecución y Monitoreo")
+    st.markdown(
+        "En esta etapa se realiza el seguimiento del progreso del proyecto, "
+        "así como la entrega de documentación asociada."
+    )
+
+    # El avance se refresca en un fragmento: solo esta sección se vuelve a ejecutar
+    # en cada intervalo o al cambiar el proyecto, no la página completa.
+    @st.fragment(run_every=INTERVALO_AVANCE)
+    def mostrar_avance():
+        with metricas.medir_fragmento("fragmento:avance"):
+            # Incorpora solo los eventos nuevos de la bitácora desde la última lectura
+            with metricas.medir("pandas:cargar_ejecucion"):
+                df_ejecucion = datos.cargar_ejecucion()
+
+            st.markdown("### Estado de Ejecución por Proyecto")
+            tablas.tabla_dataframe("ejecucion", df_ejecucion)
+
+            # Gráfico de progreso por proyecto
+            with metricas.medir("plotly:ejecucion"):
+                fig_ejecucion = px.bar(
+                    df_ejecucion,
+                    x="Nombre Proyecto",
+                    y="Progreso (%)",
+                    title="Progreso de Ejecución por Proyecto",
+                    color="Estado General",
+                    color_discrete_map={"Finalizado": "green", "En Progreso": "orange", "Retrasado": "red"},
+                    text_auto=True,
+                )
+                st.plotly_chart(fig_ejecucion, use_container_width=True)
+
+            # Selección de proyecto para detalles
+            proyecto_seleccionado = st.selectbox("Selecciona un Proyecto para Ver Detalles", df_ejecucion["Nombre Proyecto"])
+            detalle_ejecucion = df_ejecucion[df_ejecucion["Nombre Proyecto"] == proyecto_seleccionado].iloc[0]
+            st.markdown(f"""
+            **Proyecto:** {detalle_ejecucion['Nombre Proyecto']}  
+            **Progreso:** {detalle_ejecucion['Progreso (%)']}%  
+            **Documentos Entregados:** {detalle_ejecucion['Documentos Entregados']}  
+            **Estado General:** {detalle_ejecucion['Estado General']}
+            """)
+
+    mostrar_avance()
+
+    # Registro de avance para las cuadrillas en obra
+    @st.fragment
+    def formulario_avance():
+        st.markdown("### Registrar Avance de Obra")
+        df_proyectos = datos.cargar_levantamiento()
+        with st.form("registro_avance", clear_on_submit=True):
+            id_proyecto = st.selectbox(
+                "Proyecto", df_proyectos["ID Proyecto"],
+                format_func=dict(zip(df_proyectos["ID Proyecto"], df_proyectos["Nombre Proyecto"])).get
+            )
+            progreso = st.slider("Progreso (%)", min_value=0, max_value=100, value=0)
+            documentos = st.text_input("Documentos entregados (separados por coma)")
+            estado = st.selectbox("Estado", ["Automático", "En Progreso", "Retrasado"])
+            if st.form_submit_button("Registrar avance"):
+                datos.registrar_avance(id_proyecto, progreso, documentos, None if estado == "Automático" else estado)
+                st.success("Avance registrado; se reflejará en la próxima actualización del tablero.")
+
+    formulario_avance()
@@ -0,0 +1,121 @@
+import os
+
+import pandas as pd
+import streamlit as st
+
+import almacen
+import cfdi
+import datos
+import metricas
+import tablas
+
+# Sugerencias que muestra el buscador de facturas
+MAX_SUGERENCIAS = 50
+
+
+# --------------------- Pestaña: Factura Simulada ---------------------
+def mostrar():
+    st.subheader("Factura Simulada")
+    st.markdown(
+        """
+        En esta sección se generarán los datos clave para automatizar los procesos en base a la factura.
+        Las facturas se importan de sus XML de CFDI 4.0; el almacén incluye además facturas simuladas para la demo.
+        """
+    )
+
+    # Importación de CFDI: archivos subidos o una carpeta local, parseados por lotes en paralelo.
+    # Los archivos y UUID ya importados se saltan, así que volver a importar una carpeta es barato.
+    st.markdown("### Importar Facturas CFDI")
+    col_archivos, col_carpeta = st.columns(2)
+    archivos_subidos = col_archivos.file_uploader(
+        "Archivos XML de CFDI", type=["xml"], accept_multiple_files=True, key="cfdi_archivos"
+    )
+    carpeta = col_carpeta.text_input(
+        "Carpeta local con XML (incluye subcarpetas)", key="cfdi_carpeta", placeholder="/ruta/a/cfdi"
+    ).strip()
+    if st.button("Importar CFDI", disabled=not (archivos_subidos or carpeta)):
+        if carpeta and not os.path.isdir(carpeta):
+            st.error(f"La carpeta {carpeta} no existe.")
+        else:
+            archivos = [(archivo.name, archivo.getvalue()) for archivo in archivos_subidos or []]
+            if carpeta:
+                archivos += cfdi.archivos_carpeta(carpeta)
+            barra = st.progress(0.0, text=f"Importando {len(archivos):,} archivos...")
+
+            def al_avanzar(procesados, total, segundos):
+                barra.progress(
+                    procesados / max(total, 1),
+                    text=f"{procesados:,} de {total:,} archivos · {procesados / max(segundos, 1e-9):,.1f} archivos/seg",
+                )
+
+            with metricas.medir("cfdi:importar"):
+                resumen = datos.importar_cfdi(archivos, al_avanzar)
+            barra.empty()
+            st.success(
+                f"{resumen['importadas']:,} facturas importadas, {resumen['repetidas']:,} ya importadas y "
+                f"{resumen['omitidas']:,} comprobantes que no son de ingreso, de {resumen['archivos']:,} archivos "
+                f"en {resumen['segundos']:,.1f} s."
+            )
+            if resumen["errores"]:
+                with st.expander(f"{len(resumen['errores']):,} archivos no se pudieron importar"):
+                    st.dataframe(
+                        pd.DataFrame(resumen["errores"], columns=["Archivo", "Error"]),
+                        use_container_width=True, hide_index=True,
+                    )
+
+    # Facturas leídas del almacén local por páginas; los filtros se aplican en la consulta
+    st.markdown("### Detalles de Facturas")
+    col_prefijo, col_proveedor, col_estado, col_fechas = st.columns(4)
+    prefijo_tabla = col_prefijo.text_input("Número de factura empieza con", key="facturas_prefijo").strip()
+    proveedores = col_proveedor.multiselect("Proveedor", datos.cargar_proveedores(), key="facturas_proveedores")
+    estados = col_estado.multiselect("Estado de Pago", ["Pendiente", "Pagado"], key="facturas_estados")
+    rango_fechas = col_fechas.date_input("Rango de fechas", value=(), key="facturas_fechas")
+    desde, hasta = (list(rango_fechas) + [None, None])[:2]
+    tablas.tabla_facturas(
+        "facturas", prefijo=prefijo_tabla, proveedores=proveedores, estados=estados, desde=desde, hasta=hasta
+    )
+
+    # Buscador de facturas: las sugerencias salen de un rango sobre la llave primaria
+    prefijo = st.text_input("Buscar factura por número", placeholder="Ej. F00").strip()
+    with metricas.medir("almacen:buscar_facturas"):
+        sugerencias = almacen.buscar_facturas(prefijo, MAX_SUGERENCIAS)
+    factura_seleccionada = st.selectbox(
+        "Selecciona una factura para ver detalles", options=[""] + sugerencias
+    )
+
+    # Verificar y almacenar los detalles de la factura seleccionada
+    if factura_seleccionada:
+        with metricas.medir("almacen:obtener_factura"):
+            factura_detalle = almacen.obtener_factura(factura_seleccionada)
+        st.session_state["factura_seleccionada"] = factura_seleccionada
+        st.markdown(f"""
+        **Factura:** {factura_detalle['Factura']}  
+        **Proveedor:** {factura_detalle['Proveedor']}  
+        **Fecha de Emisión:** {factura_detalle['Fecha']}  
+        **Monto Total:** MXN {factura_detalle['Monto Total (MXN)']:,.2f}  
+        **Estado de Pago:** {factura_detalle['Estado de Pago']}  
+        **Productos/Servicios:** {factura_detalle['Productos']}
+        """)
+    elif st.session_state["factura_seleccionada"] is not None:
+        st.markdown("Se está utilizando la última factura seleccionada previamente.")
+    else:
+        st.warning("Por favor, selecciona una factura válida para proceder.")
+
+    # Búsqueda de facturas por producto sobre el índice de líneas
+    st.markdown("### Facturas por Producto")
+    producto_buscado = st.selectbox("Selecciona un producto", [""] + datos.cargar_productos())
+    if producto_buscado:
+        tablas.tabla_facturas("facturas_producto", producto=producto_buscado)
+
+    # Automatización de los puntos basados en la factura
+    st.markdown("### Procesos Automatizados a partir de la Factura")
+    st.markdown("1. **Levantamiento de Obra:** Se actualizan automáticamente los datos de levantamiento.")
+    st.markdown("2. **Cotización:** Se genera la cotización basada en los productos mencionados.")
+    st.markdown("3. **Orden de Compra:** La factura seleccionada representa la aceptación de la empresa.")
+    st.markdown("4. **Compra de Materiales:** Los materiales mencionados en la factura son procesados para la compra.")
+    st.markdown("5. **Programación de Obra y Timeline:** Se genera automáticamente según las fechas de la factura.")
+    st.markdown("6. **Tiempo de Vida de la Obra:** Se calcula en base a la duración de la obra especificada en la factura.")
+    st.markdown("7. **Ejecución de la Obra:** Se vinculan documentos como planos, contratos y planes de ejecución.")
+    st.markdown("8. **Pago de la Obra:** El estado de pago se usa para activar el siguiente paso del proyecto.")
+
+    st.success("Los procesos están automatizados basándose en los datos de la factura seleccionada.")
@@ -0,0 +1,52 @@
+import streamlit as st
+
+import datos
+import metricas
+import reportes_pdf
+import trabajos
+
+
+# --------------------- Generación de Factura ---------------------
+def mostrar():
+    st.subheader("Generar Factura PDF")
+    st.markdown("Crea una factura simple basada en la información de la factura seleccionada.")
+
+    # Botón para generar y descargar la factura
+    if st.button("Generar Factura PDF"):
+        factura_detalle = datos.obtener_factura_detalle()
+        if factura_detalle is not None:
+            with metricas.medir("fpdf:factura"):
+                pdf_factura = reportes_pdf.generar_factura_pdf(factura_detalle.to_dict())
+            st.download_button(
+                label="Descargar Factura PDF",
+                data=pdf_factura,
+                file_name=f"factura_{factura_detalle['Factura']}.pdf",
+                mime="application/pdf"
+            )
+            st.success("Factura generada correctamente.")
+        else:
+            st.error("No se ha seleccionado ninguna factura válida para generar el PDF.")
+
+    # Exportación masiva de facturas para el cierre de mes
+    st.markdown("### Exportación Masiva de Facturas")
+    col_fechas, col_proveedor, col_estado = st.columns(3)
+    with col_fechas:
+        rango_fechas = st.date_input("Rango de fechas", value=(), key="exportacion_fechas")
+    with col_proveedor:
+        proveedores_exportacion = st.multiselect("Proveedor", datos.cargar_proveedores())
+    with col_estado:
+        estados_exportacion = st.multiselect("Estado de Pago", ["Pendiente", "Pagado"])
+
+    desde, hasta = (list(rango_fechas) + [None, None])[:2]
+    filtros_exportacion = dict(desde=desde, hasta=hasta, proveedores=proveedores_exportacion, estados=estados_exportacion)
+    with metricas.medir("almacen:contar_facturas"):
+        total_exportacion = datos.contar_facturas(**filtros_exportacion)
+    st.markdown(f"Facturas que cumplen el filtro: **{total_exportacion:,}**")
+
+    # La exportación corre en la cola de trabajos; el progreso se consulta en el panel de abajo
+    if st.button("Exportar Facturas (ZIP)", disabled=total_exportacion == 0):
+        id_trabajo = trabajos.enviar_exportacion(filtros_exportacion, total_exportacion)
+        trabajos.recordar(id_trabajo)
+        st.success(f"Exportación enviada a la cola de trabajos (`{id_trabajo}`); puedes seguir usando el tablero.")
+
+    trabajos.mostrar_trabajos("exportacion", "application/zip")
@@ -0,0 +1,27 @@
+import streamlit as st
+
+import datos
+import metricas
+import trabajos
+
+
+# --------------------- Generación del Reporte PDF ---------------------
+def mostrar():
+    st.subheader("Generar Reporte PDF")
+    st.markdown("Genera un reporte completo y detallado con todos los datos procesados del proyecto.")
+
+    # El reporte se genera en la cola de trabajos: la página sigue respondiendo mientras tanto
+    if st.button("Generar Reporte PDF"):
+        factura_detalle = datos.obtener_factura_detalle()
+        with metricas.medir("pandas:datos_reporte"):
+            datos_reporte = datos.cargar_datos_reporte(
+                factura_detalle["Factura"] if factura_detalle is not None else None,
+                st.session_state.get("costo_diario", datos.COSTO_DIARIO_PREDETERMINADO)
+            )
+        id_trabajo = trabajos.enviar_reporte(
+            factura_detalle.to_dict() if factura_detalle is not None else None, datos_reporte
+        )
+        trabajos.recordar(id_trabajo)
+        st.success(f"Reporte enviado a la cola de trabajos (`{id_trabajo}`); puedes seguir usando el tablero.")
+
+    trabajos.mostrar_trabajos("reporte", "application/pdf")
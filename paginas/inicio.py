@@ -0,0 +1,20 @@
+import streamlit as st
+
+
+# --------------------- Pestaña: Inicio ---------------------
+def mostrar():
+    st.subheader("📌 Introducción")
+    st.markdown(
+        """
+        Este dashboard permite supervisar las etapas principales de un proyecto de construcción:
+        - **Levantamiento de Información**
+        - **Cotización**
+        - **Orden de Compra**
+        - **Compra de Materiales**
+        - **Programación de Obra**
+        - **Ejecución de la Obra**
+        - **Pago de la Obra**
+
+        Todos los procesos se automatizan a partir de los datos de una **factura simulada**.
+        """
+    )
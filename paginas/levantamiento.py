@@ -0,0 +1,34 @@
+import streamlit as st
+
+import datos
+import metricas
+import tablas
+
+
+# --------------------- Pestaña: Levantamiento ---------------------
+def mostrar():
+    st.subheader("Etapa 1: Levantamiento de Información")
+    st.markdown("En esta sección se detalla el estado y progreso de los levantamientos iniciales por proyecto.")
+
+    # Datos de levantamiento desde la capa de datos compartida
+    with metricas.medir("pandas:cargar_levantamiento"):
+        df_levantamiento = datos.cargar_levantamiento()
+
+    st.markdown("### Información de Levantamiento por Proyecto")
+    tablas.tabla_dataframe("levantamiento", df_levantamiento)
+
+    # Productos de la factura seleccionada, leídos una sola vez de sus líneas
+    st.markdown("### Productos Relacionados")
+    factura_detalle = datos.obtener_factura_detalle()
+    if factura_detalle is not None:
+        st.dataframe(
+            datos.cargar_lineas_factura(factura_detalle["Factura"])[["Producto", "Cantidad"]],
+            use_container_width=True, hide_index=True
+        )
+    else:
+        st.markdown("No disponible (sin factura seleccionada)")
+
+    # Mensaje de advertencia para proyectos pendientes
+    total_pendientes = len(df_levantamiento[df_levantamiento["Estado Levantamiento"] == "Pendiente"])
+    if total_pendientes > 0:
+        st.warning(f"Hay {total_pendientes} proyecto(s) pendiente(s) de levantamiento.")
@@ -0,0 +1,32 @@
+import streamlit as st
+
+import almacen
+import mapas
+import metricas
+
+# Altura del mapa incrustado (px)
+ALTURA_MAPA = 600
+
+
+# --------------------- Mapa de Obras ---------------------
+def mostrar():
+    st.subheader("Mapa de Obras")
+    st.markdown("Ubicación de cada obra, coloreada por su estado general de ejecución.")
+
+    version = mapas.version_sitios()
+    with metricas.medir("pandas:cargar_sitios"):
+        sitios = mapas.cargar_sitios(version)
+
+    conteos = sitios["Estado General"].value_counts()
+    columnas = st.columns(len(mapas.COLORES_ESTADO))
+    for columna, estado in zip(columnas, mapas.COLORES_ESTADO):
+        columna.metric(estado, f"{int(conteos.get(estado, 0)):,}")
+
+    estados = st.multiselect("Mostrar obras en estado", list(mapas.COLORES_ESTADO), key="mapa_estados")
+    with metricas.medir("folium:mapa_sitios"):
+        html_mapa = mapas.html_mapa_sitios(version, tuple(estados))
+    st.iframe(html_mapa, height=ALTURA_MAPA)
+
+    sin_ubicacion = almacen.contar_proyectos_sin_ubicacion()
+    if sin_ubicacion:
+        st.info(f"{sin_ubicacion:,} proyecto(s) aún no tienen ubicación registrada.")
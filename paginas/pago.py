@@ -0,0 +1,102 @@
+import calendar
+from datetime import date
+
+import plotly.graph_objects as go
+import streamlit as st
+
+import almacen
+import datos
+import metricas
+import tablas
+
+
+# --------------------- Etapa de Pago ---------------------
+def mostrar():
+    st.subheader("Etapa 5: Pago de la Obra")
+    st.markdown("Control del estado de pago según la factura seleccionada y saldos de toda la cartera.")
+
+    # Estado del pago basado en la factura seleccionada
+    factura_detalle = datos.obtener_factura_detalle()
+    if factura_detalle is not None:
+        st.markdown("### Información de la Factura Seleccionada")
+        st.markdown(f"""
+        **Factura:** {factura_detalle['Factura']}  
+        **Monto Total:** MXN {factura_detalle['Monto Total (MXN)']:,.2f}  
+        **Estado de Pago:** {factura_detalle['Estado de Pago']}
+        """)
+
+        if factura_detalle["Estado de Pago"] == "Pendiente":
+            st.warning("El pago aún está pendiente.")
+            nuevo_estado = "Pagado"
+        else:
+            st.success("El pago ha sido completado.")
+            nuevo_estado = "Pendiente"
+        if st.button(f"Marcar como {nuevo_estado}"):
+            datos.actualizar_estado_pago([factura_detalle["Factura"]], nuevo_estado)
+            st.rerun()
+    else:
+        st.error("No se ha seleccionado una factura válida para verificar el estado de pago.")
+
+    # Saldos de la cartera leídos de los resúmenes que mantiene el almacén (sin recorrer las facturas)
+    st.markdown("### Cuentas por Cobrar")
+    hoy = date.today()
+    with metricas.medir("almacen:cobranza"):
+        por_proveedor = almacen.cobranza_por_proveedor()
+        por_mes = almacen.cobranza_por_mes()
+        por_antiguedad = almacen.cobranza_por_antiguedad(hoy)
+
+    col_pendiente, col_pagado, col_vencido = st.columns(3)
+    col_pendiente.metric(
+        "Pendiente de pago", f"MXN {por_proveedor['Pendiente (MXN)'].sum():,.2f}",
+        f"{int(por_proveedor['Facturas Pendiente'].sum()):,} facturas", delta_color="off"
+    )
+    col_pagado.metric(
+        "Pagado", f"MXN {por_proveedor['Pagado (MXN)'].sum():,.2f}",
+        f"{int(por_proveedor['Facturas Pagado'].sum()):,} facturas", delta_color="off"
+    )
+    vencido = por_antiguedad[por_antiguedad["Antigüedad"] == almacen.TRAMOS_ANTIGUEDAD[-1][1]]
+    col_vencido.metric(f"Pendiente {almacen.TRAMOS_ANTIGUEDAD[-1][1].lower()}", f"MXN {vencido['Monto (MXN)'].sum():,.2f}")
+
+    tab_proveedor, tab_mes, tab_antiguedad = st.tabs(["Por proveedor", "Por mes", "Por antigüedad"])
+    with tab_proveedor:
+        tablas.tabla_dataframe("cobranza_proveedor", por_proveedor)
+    with tab_mes:
+        with metricas.medir("plotly:cobranza_mes"):
+            # Una traza de barras apiladas por estado de pago
+            fig_meses = go.Figure([
+                go.Bar(x=por_mes["Mes"], y=por_mes[f"{estado} (MXN)"], name=estado, marker_color=color)
+                for estado, color in zip(almacen.ESTADOS_PAGO, ["orange", "green"])
+            ])
+            fig_meses.update_layout(barmode="stack", title="Monto facturado por mes", yaxis_title="Monto (MXN)")
+            st.plotly_chart(fig_meses, use_container_width=True)
+        tablas.tabla_dataframe("cobranza_mes", por_mes)
+    with tab_antiguedad:
+        st.caption("Saldos pendientes según los días transcurridos desde la fecha de la factura.")
+        st.dataframe(por_antiguedad, use_container_width=True, hide_index=True)
+
+    # Detalle: las facturas de un proveedor, mes o tramo, leídas por índice en páginas
+    st.markdown("### Detalle de Facturas")
+    col_proveedor, col_mes, col_antiguedad, col_estado = st.columns(4)
+    proveedor = col_proveedor.selectbox("Proveedor", [""] + list(por_proveedor["Proveedor"]), key="cobranza_proveedor_detalle")
+    mes = col_mes.selectbox("Mes", [""] + list(por_mes["Mes"]), key="cobranza_mes_detalle")
+    antiguedad = col_antiguedad.selectbox(
+        "Antigüedad", [""] + [etiqueta for _, etiqueta in almacen.TRAMOS_ANTIGUEDAD], key="cobranza_antiguedad_detalle"
+    )
+    estados = col_estado.multiselect("Estado de Pago", almacen.ESTADOS_PAGO, default=["Pendiente"], key="cobranza_estados_detalle")
+
+    # El mes y el tramo de antigüedad se combinan como un solo rango de fechas
+    desde, hasta = None, None
+    if mes:
+        inicio_mes = date.fromisoformat(f"{mes}-01")
+        desde, hasta = inicio_mes, inicio_mes.replace(day=calendar.monthrange(inicio_mes.year, inicio_mes.month)[1])
+    if antiguedad:
+        desde_tramo, hasta_tramo = almacen.rango_antiguedad(hoy, antiguedad)
+        desde = max(filter(None, [desde, desde_tramo]), default=None)
+        hasta = min(filter(None, [hasta, hasta_tramo]), default=None)
+
+    if proveedor or mes or antiguedad:
+        tablas.tabla_facturas(
+            "cobranza_detalle", proveedores=[proveedor] if proveedor else None, estados=estados, desde=desde, hasta=hasta
+        )
+    else:
+        st.info("Elige un proveedor, un mes o un tramo de antigüedad para ver sus facturas.")
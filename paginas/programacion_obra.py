@@ -0,0 +1,115 @@
+from datetime import timedelta
+
+import streamlit as st
+
+import almacen
+import datos
+import gantt
+import metricas
+import tablas
+import programacion
+
+
+# --------------------- Etapa 3: Programación de Obra ---------------------
+def mostrar():
+    st.subheader("Etapa 3: Programación de Obra")
+    st.markdown("La programación de la obra se genera automáticamente con base en la cotización y la factura seleccionada.")
+
+    # Programa calculado por ruta crítica desde la capa de datos compartida
+    with metricas.medir("pandas:cargar_cronograma"):
+        programa_df = datos.cargar_cronograma()
+    proyectos_programa = list(programa_df["Nombre Proyecto"].unique())
+    proyecto_programa = st.selectbox("Proyecto", proyectos_programa + ["Todos los proyectos"])
+    if proyecto_programa == "Todos los proyectos":
+        cronograma_df = programa_df
+    else:
+        cronograma_df = programa_df[programa_df["Nombre Proyecto"] == proyecto_programa].reset_index(drop=True)
+
+    st.markdown("### Cronograma de Actividades")
+    with metricas.medir("dataframe:cronograma"):
+        pagina_cronograma = tablas.tabla_dataframe("cronograma", cronograma_df[[
+            "Nombre Proyecto", "ID Actividad", "Actividad", "Duración (días)", "Predecesoras",
+            "Inicio Estimado", "Fin Estimado", "Holgura (días)", "Ruta Crítica",
+        ]])
+
+    col_duracion, col_criticas = st.columns(2)
+    col_duracion.metric("Duración total (días)", int(cronograma_df["Fin Temprano"].max()))
+    col_criticas.metric("Actividades en ruta crítica", int(cronograma_df["Ruta Crítica"].sum()))
+
+    # Edición de duraciones y dependencias de la página visible: las fechas se recalculan al guardar
+    with st.expander("Editar duraciones y predecesoras (página visible)"):
+        ids_pagina = pagina_cronograma["ID Actividad"]
+        edicion_df = st.data_editor(
+            pagina_cronograma[["ID Actividad", "Actividad", "Duración (días)", "Predecesoras"]],
+            disabled=["ID Actividad", "Actividad"], hide_index=True, use_container_width=True,
+            column_config={"Duración (días)": st.column_config.NumberColumn(min_value=0, step=1)},
+            key=f"edicion_actividades_{ids_pagina.iloc[0] if len(ids_pagina) else 0}_{len(ids_pagina)}"
+        )
+        if st.button("Guardar y reprogramar"):
+            actividades_df = almacen.listar_actividades().set_index("ID Actividad")
+            cambios = edicion_df.set_index("ID Actividad")
+            actividades_df.loc[cambios.index, ["Duración (días)", "Predecesoras"]] = cambios[["Duración (días)", "Predecesoras"]]
+            try:
+                programacion.programar_obra(actividades_df.reset_index())
+            except ValueError as error:
+                st.error(f"No se pudo reprogramar: {error}")
+            else:
+                datos.actualizar_actividades(list(zip(
+                    cambios["Duración (días)"].astype(int), cambios["Predecesoras"].fillna("").astype(str),
+                    cambios.index.astype(int)
+                )))
+                st.rerun()
+
+    # Gráfico de Gantt agrupado, con detalle por grupo y ventana de fechas visible
+    st.markdown("### Diagrama de Gantt")
+    col_agrupar, col_color = st.columns(2)
+    agrupar_por = col_agrupar.radio(
+        "Agrupar por", ["Nombre Proyecto", "Actividad"], horizontal=True,
+        format_func=lambda columna: "Proyecto" if columna == "Nombre Proyecto" else "Fase (actividad)"
+    )
+    color_por = col_color.radio("Colorear por", ["Grupo", "Ruta Crítica"], horizontal=True)
+
+    grupos = list(cronograma_df[agrupar_por].unique())
+    expandidos = st.multiselect(
+        "Mostrar detalle de", grupos,
+        default=grupos if len(cronograma_df) <= 60 else [],
+        key=f"gantt_expandidos_{agrupar_por}_{proyecto_programa}"
+    )
+
+    inicio_programa = cronograma_df["Inicio Estimado"].min().date()
+    fin_programa = cronograma_df["Fin Estimado"].max().date()
+    if inicio_programa < fin_programa:
+        rango_visible = st.slider(
+            "Rango de fechas visible", min_value=inicio_programa, max_value=fin_programa,
+            value=(inicio_programa, fin_programa), key=f"gantt_rango_{proyecto_programa}"
+        )
+    else:
+        rango_visible = (inicio_programa, fin_programa)
+
+    with metricas.medir("pandas:filas_gantt"):
+        filas_gantt, omitidas = gantt.filas_gantt(
+            gantt.filtrar_rango(cronograma_df, *rango_visible), agrupar_por, expandidos
+        )
+    if omitidas:
+        st.info(f"Se omitieron {omitidas:,} barras; reduce el rango de fechas o los grupos en detalle para verlas.")
+    with metricas.medir("plotly:gantt"):
+        fig_gantt = gantt.figura_gantt(filas_gantt, color_por)
+        fig_gantt.update_xaxes(range=[rango_visible[0], rango_visible[1] + timedelta(days=1)])
+        st.plotly_chart(fig_gantt, use_container_width=True)
+
+    # Cálculo estimado de costos por actividad
+    costo_diario = st.number_input(
+        "Introduce el costo diario promedio por actividad (MXN):",
+        min_value=0, value=st.session_state.get("costo_diario", datos.COSTO_DIARIO_PREDETERMINADO), step=1000
+    )
+    st.session_state["costo_diario"] = costo_diario
+    cronograma_df = cronograma_df.assign(**{"Costo Estimado (MXN)": cronograma_df["Duración (días)"] * costo_diario})
+
+    tablas.tabla_dataframe(
+        "costos", cronograma_df[["Nombre Proyecto", "Actividad", "Duración (días)", "Costo Estimado (MXN)"]]
+    )
+
+    # Gráfico de costos estimados (una sola traza, agregada por actividad)
+    with metricas.medir("plotly:costos"):
+        fig_costos = gantt.figura_costos(cronograma_df)
+        st.plotly_chart(fig_costos, use_container_width=True)
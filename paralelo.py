@@ -0,0 +1,42 @@
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+# Reparto de lotes en un pool de procesos, común a la exportación de PDFs y a la
+# importación de CFDI. Solo hay unos pocos lotes en vuelo a la vez y cada resultado
+# se entrega en cuanto llega, así la memoria no crece con el tamaño del trabajo.
+LOTES_EN_VUELO_POR_PROCESO = 2
+
+
+def procesar_lotes(lotes, funcion, al_terminar, procesos=None, ejecutor=None):
+    # Llama a al_terminar(funcion(lote)) por cada lote, en orden. funcion corre en los procesos
+    # trabajadores; con un solo proceso y sin ejecutor los lotes se procesan aquí mismo. Con
+    # ejecutor se usa ese pool (p. ej. el de la cola de trabajos) y no se cierra al terminar.
+    procesos = procesos or os.cpu_count() or 1
+    if procesos == 1 and ejecutor is None:
+        for lote in lotes:
+            al_terminar(funcion(lote))
+        return
+
+    if ejecutor is None:
+        ejecutor = propio = ProcessPoolExecutor(max_workers=procesos, mp_context=multiprocessing.get_context("spawn"))
+    else:
+        propio = nullcontext()
+    with propio:
+        en_vuelo = deque()
+        lotes = iter(lotes)
+        agotado = False
+        while en_vuelo or not agotado:
+            while not agotado and len(en_vuelo) < procesos * LOTES_EN_VUELO_POR_PROCESO:
+                lote = next(lotes, None)
+                if lote is None:
+                    agotado = True
+                elif lote:
+                    en_vuelo.append(ejecutor.submit(funcion, lote))
+                else:
+                    # Un lote vacío no vale el viaje al pool
+                    al_terminar(funcion(lote))
+            if en_vuelo:
+                al_terminar(en_vuelo.popleft().result())
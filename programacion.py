@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+
+# Motor de programación de obra por ruta crítica (CPM).
+# Las actividades se guardan en arreglos y las dependencias como una lista de
+# aristas (predecesora -> actividad). Cada pasada recorre los niveles del orden
+# topológico; dentro de un nivel todo se calcula con operaciones vectorizadas.
+
+
+def _aristas(ids, predecesoras):
+    # Convierte la columna "1, 2" de predecesoras en arreglos de posiciones origen/destino
+    partes = predecesoras.fillna("").astype(str).str.split(",").explode().str.strip()
+    partes = partes[partes != ""]
+    destino = partes.index.to_numpy(dtype=np.int64)
+    origen = pd.Index(ids).get_indexer(pd.to_numeric(partes, errors="coerce"))
+    if (origen < 0).any():
+        desconocidas = sorted(set(partes[origen < 0]))
+        raise ValueError(f"Predecesoras inexistentes: {', '.join(desconocidas[:10])}")
+    return origen.astype(np.int64), destino
+
+
+def _niveles(n, origen, destino):
+    # Orden topológico por niveles (algoritmo de Kahn en bloque)
+    orden_salida = np.argsort(origen, kind="stable")
+    destinos_ordenados = destino[orden_salida]
+    inicio_salidas = np.searchsorted(origen[orden_salida], np.arange(n + 1))
+
+    grado_entrada = np.bincount(destino, minlength=n)
+    nivel = np.full(n, -1, dtype=np.int64)
+    frontera = np.flatnonzero(grado_entrada == 0)
+    actual = 0
+    while frontera.size:
+        nivel[frontera] = actual
+        # Aristas que salen de la frontera
+        conteos = inicio_salidas[frontera + 1] - inicio_salidas[frontera]
+        if conteos.sum() == 0:
+            break
+        posiciones = np.repeat(inicio_salidas[frontera] - np.cumsum(conteos) + conteos, conteos) + np.arange(conteos.sum())
+        sucesores = destinos_ordenados[posiciones]
+        grado_entrada -= np.bincount(sucesores, minlength=n)
+        candidatos = np.unique(sucesores)
+        frontera = candidatos[grado_entrada[candidatos] == 0]
+        actual += 1
+
+    if (nivel < 0).any():
+        raise ValueError("Las dependencias entre actividades contienen un ciclo.")
+    return nivel
+
+
+def _agrupar_por_nivel(nivel_aristas):
+    orden = np.argsort(nivel_aristas, kind="stable")
+    limites = np.flatnonzero(np.diff(nivel_aristas[orden])) + 1
+    return orden, np.split(np.arange(orden.size), limites)
+
+
+def calcular_ruta_critica(duraciones, ids, predecesoras, proyectos):
+    # Devuelve inicio/fin tempranos y tardíos, holgura y ruta crítica (en días desde el inicio del proyecto)
+    duracion = np.asarray(duraciones, dtype=np.int64)
+    if (duracion < 0).any():
+        # Una duración negativa haría empezar a una sucesora antes de que termine su predecesora
+        raise ValueError(f"Las duraciones no pueden ser negativas ({int((duracion < 0).sum())} actividades).")
+    n = duracion.size
+    origen, destino = _aristas(ids, pd.Series(predecesoras).reset_index(drop=True))
+    nivel = _niveles(n, origen, destino)
+
+    # Pasada hacia adelante: inicio temprano = máximo fin temprano de las predecesoras
+    inicio_temprano = np.zeros(n, dtype=np.int64)
+    nodos_por_nivel = np.argsort(nivel, kind="stable")
+    cortes_nodos = np.searchsorted(nivel[nodos_por_nivel], np.arange(nivel.max(initial=0) + 2))
+    orden_aristas, grupos = _agrupar_por_nivel(nivel[destino])
+    aristas_por_nivel = {nivel[destino[orden_aristas[g[0]]]]: orden_aristas[g] for g in grupos if g.size}
+    fin_temprano = inicio_temprano + duracion
+    for nivel_actual in range(nivel.max(initial=0) + 1):
+        aristas = aristas_por_nivel.get(nivel_actual)
+        if aristas is not None:
+            np.maximum.at(inicio_temprano, destino[aristas], fin_temprano[origen[aristas]])
+        nodos = nodos_por_nivel[cortes_nodos[nivel_actual]:cortes_nodos[nivel_actual + 1]]
+        fin_temprano[nodos] = inicio_temprano[nodos] + duracion[nodos]
+
+    # Cada proyecto termina con su actividad más tardía
+    codigos_proyecto, _ = pd.factorize(pd.Series(proyectos))
+    fin_proyecto = np.zeros(codigos_proyecto.max(initial=-1) + 1, dtype=np.int64)
+    np.maximum.at(fin_proyecto, codigos_proyecto, fin_temprano)
+
+    # Pasada hacia atrás: fin tardío = mínimo inicio tardío de las sucesoras
+    fin_tardio = fin_proyecto[codigos_proyecto].copy()
+    inicio_tardio = fin_tardio - duracion
+    orden_aristas, grupos = _agrupar_por_nivel(nivel[origen])
+    aristas_por_nivel = {nivel[origen[orden_aristas[g[0]]]]: orden_aristas[g] for g in grupos if g.size}
+    for nivel_actual in range(nivel.max(initial=0), -1, -1):
+        aristas = aristas_por_nivel.get(nivel_actual)
+        if aristas is not None:
+            np.minimum.at(fin_tardio, origen[aristas], inicio_tardio[destino[aristas]])
+        nodos = nodos_por_nivel[cortes_nodos[nivel_actual]:cortes_nodos[nivel_actual + 1]]
+        inicio_tardio[nodos] = fin_tardio[nodos] - duracion[nodos]
+
+    holgura = inicio_tardio - inicio_temprano
+    return pd.DataFrame({
+        "Inicio Temprano": inicio_temprano,
+        "Fin Temprano": fin_temprano,
+        "Inicio Tardío": inicio_tardio,
+        "Fin Tardío": fin_tardio,
+        "Holgura (días)": holgura,
+        "Ruta Crítica": holgura == 0,
+    })
+
+
+def programar_obra(actividades):
+    # actividades: ID Actividad, ID Proyecto, Actividad, Duración (días), Predecesoras, Fecha Inicio Proyecto
+    actividades = actividades.reset_index(drop=True)
+    resultado = calcular_ruta_critica(
+        actividades["Duración (días)"], actividades["ID Actividad"],
+        actividades["Predecesoras"], actividades["ID Proyecto"],
+    )
+    fecha_inicio = pd.to_datetime(actividades["Fecha Inicio Proyecto"])
+    programa = pd.concat([actividades.drop(columns="Fecha Inicio Proyecto"), resultado], axis=1)
+    programa["Inicio Estimado"] = fecha_inicio + pd.to_timedelta(resultado["Inicio Temprano"], unit="D")
+    # El fin se expresa como el último día de trabajo (inclusivo)
+    programa["Fin Estimado"] = fecha_inicio + pd.to_timedelta(
+        np.maximum(resultado["Fin Temprano"] - 1, resultado["Inicio Temprano"]), unit="D"
+    )
+    return programa
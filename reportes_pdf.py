@@ -0,0 +1,181 @@
+import pandas as pd
+import streamlit as st
+from fpdf import FPDF
+
+# Número máximo de PDFs distintos que se conservan en memoria
+MAX_PDFS_CACHEADOS = 64
+
+# fpdf 1.7 solo escribe latin-1: la puntuación tipográfica común se cambia por su equivalente
+# simple y lo que aún no quepa en latin-1 se reemplaza por "?"
+EQUIVALENTES_LATIN1 = str.maketrans({
+    "–": "-", "—": "-", "‒": "-", "−": "-", "‘": "'", "’": "'", "‚": "'", "′": "'",
+    "“": '"', "”": '"', "„": '"', "″": '"', "…": "...", "•": "-", "€": "EUR", "\u200b": "",
+})
+
+
+def texto_pdf(texto):
+    return str(texto).translate(EQUIVALENTES_LATIN1).encode("latin-1", "replace").decode("latin-1")
+
+
+class DocumentoPDF(FPDF):
+    # Todo texto que se escribe en el documento pasa por texto_pdf
+    def cell(self, w, h=0, txt="", *args, **kwargs):
+        return super().cell(w, h, texto_pdf(txt), *args, **kwargs)
+
+    def multi_cell(self, w, h, txt="", *args, **kwargs):
+        return super().multi_cell(w, h, texto_pdf(txt), *args, **kwargs)
+
+
+def pdf_a_bytes(pdf):
+    # Renderiza el documento directamente en memoria, sin pasar por el disco.
+    # fpdf 1.7 devuelve una cadena latin-1 y fpdf2 un bytearray.
+    salida = pdf.output(dest="S")
+    if isinstance(salida, str):
+        salida = salida.encode("latin-1")
+    return bytes(salida)
+
+
+def construir_factura_pdf(factura_detalle):
+    pdf = DocumentoPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", "B", 16)
+    pdf.cell(200, 10, txt="Factura - Holtmont México", ln=True, align="C")
+    pdf.ln(10)
+
+    # Datos principales de la factura
+    pdf.set_font("Arial", "B", 12)
+    pdf.cell(200, 10, txt="Detalles de la Factura:", ln=True)
+    pdf.set_font("Arial", size=10)
+    pdf.cell(0, 10, txt=f"Factura: {factura_detalle['Factura']}", ln=True)
+    pdf.cell(0, 10, txt=f"Proveedor: {factura_detalle['Proveedor']}", ln=True)
+    pdf.cell(0, 10, txt=f"Fecha: {factura_detalle['Fecha']}", ln=True)
+    pdf.cell(0, 10, txt=f"Monto Total: MXN {factura_detalle['Monto Total (MXN)']:,.2f}", ln=True)
+    pdf.cell(0, 10, txt=f"Estado de Pago: {factura_detalle['Estado de Pago']}", ln=True)
+    pdf.cell(0, 10, txt=f"Productos: {factura_detalle['Productos']}", ln=True)
+
+    pdf.ln(10)
+    pdf.cell(200, 10, txt="Gracias por su preferencia.", ln=True, align="C")
+    return pdf
+
+
+def renderizar_factura_pdf(factura_detalle):
+    return pdf_a_bytes(construir_factura_pdf(factura_detalle))
+
+
+# Columnas de cada sección del reporte: (encabezado, columna, ancho en mm)
+SECCIONES_REPORTE = {
+    "levantamiento": [
+        ("ID", "ID Proyecto", 12), ("Proyecto", "Nombre Proyecto", 60),
+        ("Responsable", "Responsable", 45), ("Estado", "Estado Levantamiento", 73),
+    ],
+    "cotizacion": [
+        ("Producto", "Producto", 70), ("Costo Unitario", "Costo Unitario (MXN)", 40),
+        ("Cantidad", "Cantidad", 25), ("Costo Total", "Costo Total (MXN)", 55),
+    ],
+    "cronograma": [
+        ("Proyecto", "Nombre Proyecto", 42), ("Actividad", "Actividad", 50), ("Días", "Duración (días)", 12),
+        ("Inicio", "Inicio Estimado", 22), ("Fin", "Fin Estimado", 22), ("Costo Estimado", "Costo Estimado (MXN)", 42),
+    ],
+    "ejecucion": [
+        ("Proyecto", "Nombre Proyecto", 55), ("Progreso", "Progreso (%)", 20),
+        ("Estado", "Estado General", 30), ("Documentos", "Documentos Entregados", 85),
+    ],
+}
+COLUMNAS_MONEDA = {"Costo Unitario (MXN)", "Costo Total (MXN)", "Costo Estimado (MXN)"}
+ALTO_FILA = 6
+MM_POR_CARACTER = 1.8  # Aproximación para Arial 8
+
+
+def _textos_tabla(df, columnas):
+    # Formatea columna por columna (no fila por fila) y recorta al ancho de la celda
+    textos = {}
+    for _, columna, ancho in columnas:
+        serie = df[columna]
+        if columna in COLUMNAS_MONEDA:
+            serie = "MXN " + serie.astype(float).map("{:,.2f}".format)
+        elif columna == "Progreso (%)":
+            serie = serie.astype(str) + "%"
+        else:
+            serie = serie.astype(str)
+        textos[columna] = serie.str.slice(0, int(ancho / MM_POR_CARACTER))
+    return pd.DataFrame(textos).to_numpy()
+
+
+def _encabezado_tabla(pdf, columnas):
+    pdf.set_font("Arial", "B", 8)
+    pdf.set_fill_color(220, 220, 220)
+    for encabezado, _, ancho in columnas:
+        pdf.cell(ancho, ALTO_FILA, txt=encabezado, border=1, fill=True)
+    pdf.ln()
+    pdf.set_font("Arial", size=8)
+
+
+def _tabla(pdf, titulo, df, columnas):
+    pdf.set_font("Arial", "B", 12)
+    pdf.cell(200, 10, txt=titulo, ln=True)
+    if df is None or df.empty:
+        pdf.set_font("Arial", size=10)
+        pdf.cell(0, 10, txt="Sin datos disponibles.", ln=True)
+        pdf.ln(5)
+        return
+
+    anchos = [ancho for _, _, ancho in columnas]
+    _encabezado_tabla(pdf, columnas)
+    for fila in _textos_tabla(df, columnas):
+        # Salto de página manual para repetir el encabezado de la tabla
+        if pdf.get_y() + ALTO_FILA > pdf.page_break_trigger:
+            pdf.add_page()
+            _encabezado_tabla(pdf, columnas)
+        for ancho, texto in zip(anchos, fila):
+            pdf.cell(ancho, ALTO_FILA, txt=texto, border=1)
+        pdf.ln()
+    pdf.ln(8)
+
+
+def construir_reporte_pdf(factura_detalle=None, df_levantamiento=None, df_cotizacion=None,
+                          cronograma_df=None, df_ejecucion=None):
+    pdf = DocumentoPDF()
+    pdf.set_auto_page_break(True, margin=15)
+    pdf.add_page()
+
+    # Título principal
+    pdf.set_font("Arial", "B", 16)
+    pdf.cell(200, 10, txt="Reporte Detallado de Proyectos - Holtmont México", ln=True, align="C")
+    pdf.ln(10)
+
+    # Sección: Factura
+    if factura_detalle is not None:
+        pdf.set_font("Arial", "B", 12)
+        pdf.cell(200, 10, txt="Detalles de la Factura Seleccionada", ln=True)
+        pdf.set_font("Arial", size=10)
+        pdf.cell(
+            0, 10,
+            txt=f"Factura: {factura_detalle['Factura']} | Proveedor: {factura_detalle['Proveedor']} | "
+                f"Monto Total: MXN {factura_detalle['Monto Total (MXN)']:,.2f} | Estado: {factura_detalle['Estado de Pago']}",
+            ln=True
+        )
+        pdf.ln(5)
+        pdf.multi_cell(0, 10, txt=f"Productos/Servicios: {factura_detalle['Productos']}")
+        pdf.ln(10)
+
+    _tabla(pdf, "Etapa 1: Levantamiento", df_levantamiento, SECCIONES_REPORTE["levantamiento"])
+    _tabla(pdf, "Etapa 2: Cotización", df_cotizacion, SECCIONES_REPORTE["cotizacion"])
+    _tabla(pdf, "Etapa 3: Programación de Obra", cronograma_df, SECCIONES_REPORTE["cronograma"])
+    _tabla(pdf, "Etapa 4: Ejecución y Monitoreo", df_ejecucion, SECCIONES_REPORTE["ejecucion"])
+
+    return pdf
+
+
+def renderizar_reporte_pdf(factura_detalle=None, df_levantamiento=None, df_cotizacion=None,
+                           cronograma_df=None, df_ejecucion=None):
+    # Sin caché: se usa desde los procesos de la cola de trabajos
+    return pdf_a_bytes(construir_reporte_pdf(
+        factura_detalle, df_levantamiento, df_cotizacion, cronograma_df, df_ejecucion
+    ))
+
+
+# Los PDFs se memorizan por el contenido de sus entradas (st.cache_data las
+# hashea), con desalojo acotado: descargar otra vez la misma factura no cuesta nada.
+@st.cache_data(max_entries=MAX_PDFS_CACHEADOS, show_spinner=False)
+def generar_factura_pdf(factura_detalle):
+    return renderizar_factura_pdf(factura_detalle)
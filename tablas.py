@@ -0,0 +1,65 @@
+import math
+
+import streamlit as st
+
+import almacen
+import datos
+import metricas
+
+# Tablas paginadas: el orden y los filtros se resuelven en la fuente de datos y
+# solo la página visible se envía al navegador.
+TAMANOS_PAGINA = (25, 50, 100, 250)
+
+
+def controles_tabla(clave, columnas, total):
+    # Orden, dirección y página; devuelve (orden, descendente, desplazamiento, limite)
+    col_orden, col_direccion, col_tamano, col_pagina = st.columns([3, 3, 2, 2])
+    orden = col_orden.selectbox("Ordenar por", columnas, key=f"{clave}_orden")
+    direccion = col_direccion.radio(
+        "Dirección", ["Ascendente", "Descendente"], horizontal=True, key=f"{clave}_direccion"
+    )
+    tamano = col_tamano.selectbox("Filas por página", TAMANOS_PAGINA, key=f"{clave}_tamano")
+
+    paginas = max(math.ceil(total / tamano), 1)
+    # Si los filtros reducen el total, la página guardada se ajusta al nuevo máximo
+    if st.session_state.get(f"{clave}_pagina", 1) > paginas:
+        st.session_state[f"{clave}_pagina"] = paginas
+    pagina = col_pagina.number_input("Página", min_value=1, max_value=paginas, step=1, key=f"{clave}_pagina")
+    return orden, direccion == "Descendente", (pagina - 1) * tamano, tamano
+
+
+def tabla_paginada(clave, total, obtener_pagina, columnas):
+    # obtener_pagina(orden, descendente, desplazamiento, limite) lee solo las filas visibles
+    orden, descendente, desplazamiento, limite = controles_tabla(clave, columnas, total)
+    pagina_df = obtener_pagina(orden, descendente, desplazamiento, limite)
+    st.dataframe(pagina_df, use_container_width=True, hide_index=True)
+    if total:
+        st.caption(f"Filas {desplazamiento + 1:,}–{desplazamiento + len(pagina_df):,} de {total:,}")
+    return pagina_df
+
+
+def pagina_dataframe(df, orden, descendente, desplazamiento, limite):
+    # Para tablas ya calculadas en memoria: ordena y recorta antes de serializar
+    return df.sort_values(orden, ascending=not descendente, kind="stable").iloc[desplazamiento:desplazamiento + limite]
+
+
+def tabla_dataframe(clave, df):
+    return tabla_paginada(
+        clave, len(df),
+        lambda orden, descendente, desplazamiento, limite: pagina_dataframe(df, orden, descendente, desplazamiento, limite),
+        list(df.columns),
+    )
+
+
+def tabla_facturas(clave, **filtros):
+    # Conteo y página se resuelven en SQLite con los mismos filtros
+    with metricas.medir(f"almacen:contar_facturas:{clave}"):
+        total = datos.contar_facturas(**filtros)
+    with metricas.medir(f"dataframe:{clave}"):
+        return tabla_paginada(
+            clave, total,
+            lambda orden, descendente, desplazamiento, limite: datos.pagina_facturas(
+                orden, descendente, desplazamiento, limite, **filtros
+            ),
+            list(almacen.COLUMNAS_ORDEN_FACTURA),
+        )
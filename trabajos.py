@@ -0,0 +1,282 @@
+import hashlib
+import multiprocessing
+import os
+import pickle
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+import pandas as pd
+import streamlit as st
+
+import almacen
+import exportacion
+import reportes_pdf
+
+# Cola local de trabajos largos (reportes y exportaciones). Cada trabajo corre en
+# un hilo del ejecutor compartido por todas las sesiones; el trabajo pesado de
+# CPU se delega a un pool de procesos. El estado vive en memoria y el resultado
+# en un archivo, así la sesión que lo pidió sigue interactiva y puede volver por él.
+DIRECTORIO_TRABAJOS = os.path.join(almacen.DIRECTORIO_DATOS, "trabajos")
+MAX_TRABAJOS_SIMULTANEOS = 2
+# Un solo pool de procesos para todos los trabajos: los reportes y exportaciones simultáneos se lo reparten
+PROCESOS_POOL = os.cpu_count() or 1
+MAX_TRABAJOS_GUARDADOS = 100
+# Subcarpetas de otras colas sin actividad en este tiempo (s) se consideran huérfanas y se borran
+ANTIGUEDAD_HUERFANOS = 24 * 3600
+INTERVALO_SONDEO = 2
+CLAVE_SESION = "trabajos_sesion"
+
+EN_COLA, EN_PROCESO, TERMINADO, FALLIDO = "En cola", "En proceso", "Terminado", "Fallido"
+ACTIVOS = (EN_COLA, EN_PROCESO)
+
+
+def _nuevo_pool_procesos():
+    return ProcessPoolExecutor(PROCESOS_POOL, mp_context=multiprocessing.get_context("spawn"))
+
+
+def _ultima_actividad(ruta):
+    # mtime más reciente de la ruta y, si es carpeta, de sus archivos (un .parcial en curso se sigue escribiendo)
+    try:
+        tiempos = [os.path.getmtime(ruta)]
+        if os.path.isdir(ruta):
+            tiempos.extend(entrada.stat().st_mtime for entrada in os.scandir(ruta))
+    except OSError:
+        return time.time()
+    return max(tiempos)
+
+
+def _barrer_huerfanos(propia):
+    # El directorio de datos puede ser compartido por varios procesos del servidor: solo se borra
+    # lo que lleva más de ANTIGUEDAD_HUERFANOS sin cambios, nunca la carpeta de una cola activa
+    limite = time.time() - ANTIGUEDAD_HUERFANOS
+    for nombre in os.listdir(DIRECTORIO_TRABAJOS):
+        ruta = os.path.join(DIRECTORIO_TRABAJOS, nombre)
+        if nombre == propia or _ultima_actividad(ruta) >= limite:
+            continue
+        if os.path.isdir(ruta):
+            shutil.rmtree(ruta, ignore_errors=True)
+        elif os.path.exists(ruta):
+            os.remove(ruta)
+
+
+@st.cache_resource
+def obtener_cola():
+    # Una sola cola por proceso, compartida por todas las sesiones. El estado de los trabajos
+    # solo vive en memoria; sus archivos van en una subcarpeta propia de esta cola.
+    carpeta = uuid.uuid4().hex
+    directorio = os.path.join(DIRECTORIO_TRABAJOS, carpeta)
+    os.makedirs(directorio)
+    _barrer_huerfanos(carpeta)
+    return {
+        "directorio": directorio,
+        "hilos": ThreadPoolExecutor(MAX_TRABAJOS_SIMULTANEOS, thread_name_prefix="trabajo"),
+        "procesos": None,
+        "trabajos": {},
+        "por_clave": {},
+        "candado": threading.Lock(),
+    }
+
+
+def _contenido(valor):
+    # Los DataFrames se reducen al hash de su contenido: su pickle no es estable entre copias iguales
+    if isinstance(valor, pd.DataFrame):
+        return (
+            tuple(valor.columns), tuple(map(str, valor.dtypes)),
+            pd.util.hash_pandas_object(valor, index=True).to_numpy().tobytes(),
+        )
+    if isinstance(valor, dict):
+        return tuple(sorted((clave, _contenido(dato)) for clave, dato in valor.items()))
+    if isinstance(valor, (list, tuple)):
+        return tuple(_contenido(dato) for dato in valor)
+    return valor
+
+
+def huella(*entradas):
+    # Clave de deduplicación: el mismo tipo de trabajo con las mismas entradas produce el mismo archivo
+    return hashlib.sha256(pickle.dumps(_contenido(entradas), protocol=pickle.HIGHEST_PROTOCOL)).hexdigest()
+
+
+def _ejecutar(cola, trabajo, funcion):
+    trabajo.update(estado=EN_PROCESO, iniciado=time.time())
+
+    def avanzar(fraccion, mensaje=""):
+        trabajo.update(progreso=min(max(fraccion, 0.0), 1.0), mensaje=mensaje)
+
+    # Se escribe a un archivo parcial y se renombra al terminar: nunca se descarga un resultado a medias
+    parcial = trabajo["ruta"] + ".parcial"
+    try:
+        aviso = funcion(cola, parcial, avanzar)
+        os.replace(parcial, trabajo["ruta"])
+    except Exception as error:
+        trabajo.update(estado=FALLIDO, mensaje=f"{type(error).__name__}: {error}")
+        if os.path.exists(parcial):
+            os.remove(parcial)
+    else:
+        trabajo.update(estado=TERMINADO, progreso=1.0, aviso=aviso or "")
+    trabajo["terminado"] = time.time()
+
+
+def _depurar(cola):
+    # Conserva solo los trabajos más recientes; los resultados viejos se borran del disco
+    terminados = sorted(
+        (trabajo for trabajo in cola["trabajos"].values() if trabajo["estado"] not in ACTIVOS),
+        key=lambda trabajo: trabajo["creado"],
+    )
+    for trabajo in terminados[:max(len(cola["trabajos"]) - MAX_TRABAJOS_GUARDADOS, 0)]:
+        del cola["trabajos"][trabajo["id"]]
+        if cola["por_clave"].get(trabajo["clave"]) == trabajo["id"]:
+            del cola["por_clave"][trabajo["clave"]]
+        if os.path.exists(trabajo["ruta"]):
+            os.remove(trabajo["ruta"])
+
+
+def enviar(tipo, clave, funcion, nombre_archivo, descripcion=""):
+    # funcion(cola, ruta, avanzar) escribe el resultado en ruta y puede devolver un aviso para el
+    # panel (p. ej. facturas que no se exportaron). Devuelve el id del trabajo;
+    # si ya hay uno con la misma clave (en curso o terminado) se reutiliza en lugar de repetirlo.
+    cola = obtener_cola()
+    with cola["candado"]:
+        existente = cola["trabajos"].get(cola["por_clave"].get(clave))
+        if existente and existente["estado"] != FALLIDO and (
+            existente["estado"] in ACTIVOS or os.path.exists(existente["ruta"])
+        ):
+            return existente["id"]
+
+        id_trabajo = uuid.uuid4().hex[:12]
+        trabajo = {
+            "id": id_trabajo,
+            "tipo": tipo,
+            "clave": clave,
+            "descripcion": descripcion,
+            "nombre_archivo": nombre_archivo,
+            "ruta": os.path.join(cola["directorio"], f"{id_trabajo}_{nombre_archivo}"),
+            "estado": EN_COLA,
+            "progreso": 0.0,
+            "mensaje": "",
+            "aviso": "",
+            "creado": time.time(),
+            "iniciado": None,
+            "terminado": None,
+        }
+        cola["trabajos"][id_trabajo] = trabajo
+        cola["por_clave"][clave] = id_trabajo
+        _depurar(cola)
+    cola["hilos"].submit(_ejecutar, cola, trabajo, funcion)
+    return id_trabajo
+
+
+def obtener(id_trabajo):
+    trabajo = obtener_cola()["trabajos"].get(id_trabajo)
+    return dict(trabajo) if trabajo else None
+
+
+def recordar(id_trabajo):
+    # Los trabajos que pidió la sesión, para mostrarlos en su panel
+    ids = st.session_state.setdefault(CLAVE_SESION, [])
+    if id_trabajo not in ids:
+        ids.append(id_trabajo)
+
+
+def _leer_archivo(ruta):
+    with open(ruta, "rb") as archivo:
+        return archivo.read()
+
+
+def mostrar_trabajos(tipo, mime):
+    # Panel de los trabajos de la sesión; mientras haya alguno activo se actualiza solo
+    trabajos = [obtener(id_trabajo) for id_trabajo in st.session_state.get(CLAVE_SESION, [])]
+    trabajos = [trabajo for trabajo in trabajos if trabajo and trabajo["tipo"] == tipo]
+    activos = any(trabajo["estado"] in ACTIVOS for trabajo in trabajos)
+
+    @st.fragment(run_every=INTERVALO_SONDEO if activos else None)
+    def panel():
+        vigentes = [obtener(trabajo["id"]) for trabajo in trabajos]
+        for trabajo in reversed([trabajo for trabajo in vigentes if trabajo]):
+            encabezado = f"**{trabajo['descripcion'] or trabajo['nombre_archivo']}** · `{trabajo['id']}` · {trabajo['estado']}"
+            if trabajo["estado"] in ACTIVOS:
+                st.progress(trabajo["progreso"], text=f"{encabezado} · {trabajo['mensaje']}")
+            elif trabajo["estado"] == TERMINADO and os.path.exists(trabajo["ruta"]):
+                duracion = trabajo["terminado"] - (trabajo["iniciado"] or trabajo["creado"])
+                st.markdown(f"{encabezado} en {duracion:,.1f} s")
+                if trabajo["aviso"]:
+                    st.warning(trabajo["aviso"])
+                st.download_button(
+                    label=f"Descargar {trabajo['nombre_archivo']}",
+                    data=partial(_leer_archivo, trabajo["ruta"]),
+                    file_name=trabajo["nombre_archivo"],
+                    mime=mime,
+                    key=f"descarga_{trabajo['id']}",
+                )
+            else:
+                st.error(f"{encabezado} · {trabajo['mensaje'] or 'El resultado ya no está disponible.'}")
+        # Al terminar el último trabajo activo se vuelve a ejecutar la página para dejar de sondear
+        if activos and not any(trabajo and trabajo["estado"] in ACTIVOS for trabajo in vigentes):
+            st.rerun()
+
+    if trabajos:
+        panel()
+
+
+def _pool_procesos(cola):
+    # El pool de procesos se crea con el primer trabajo que lo necesita; las sesiones que no piden ninguno no lo arrancan
+    with cola["candado"]:
+        if cola["procesos"] is None:
+            cola["procesos"] = _nuevo_pool_procesos()
+        return cola["procesos"]
+
+
+def _en_pool(cola, funcion):
+    # funcion(ejecutor) corre sobre el pool compartido de la cola
+    try:
+        return funcion(_pool_procesos(cola))
+    except BrokenProcessPool:
+        # Si un proceso murió, el pool queda inservible: el siguiente trabajo crea uno nuevo
+        with cola["candado"]:
+            cola["procesos"] = None
+        raise
+
+
+def _generar_reporte(entradas, cola, ruta, avanzar):
+    avanzar(0.1, "Renderizando el PDF...")
+    contenido = _en_pool(cola, lambda ejecutor: ejecutor.submit(reportes_pdf.renderizar_reporte_pdf, **entradas).result())
+    avanzar(0.9, "Guardando el PDF...")
+    with open(ruta, "wb") as archivo:
+        archivo.write(contenido)
+
+
+def enviar_reporte(factura_detalle, datos_reporte):
+    # Las entradas ya vienen reunidas por la sesión; el trabajo solo renderiza y guarda
+    entradas = {"factura_detalle": factura_detalle, **datos_reporte}
+    return enviar(
+        "reporte", huella("reporte", entradas), partial(_generar_reporte, entradas), "reporte_detallado.pdf",
+        f"Reporte de la factura {factura_detalle['Factura']}" if factura_detalle else "Reporte general",
+    )
+
+
+def _exportar_facturas(filtros, total, cola, ruta, avanzar):
+    def al_avanzar(procesadas, total, segundos):
+        avanzar(
+            procesadas / max(total, 1),
+            f"{procesadas:,} de {total:,} facturas · {procesadas / max(segundos, 1e-9):,.1f} PDFs/seg",
+        )
+
+    resumen = _en_pool(cola, lambda ejecutor: exportacion.exportar_facturas_zip(
+        almacen.iterar_facturas(**filtros), ruta, total=total, al_avanzar=al_avanzar,
+        procesos=PROCESOS_POOL, ejecutor=ejecutor,
+    ))
+    if resumen["errores"]:
+        return f"{len(resumen['errores']):,} facturas sin PDF; el detalle está en errores.csv dentro del ZIP"
+
+
+def enviar_exportacion(filtros, total):
+    # La versión de las facturas evita reutilizar un ZIP generado antes de un cambio en los datos
+    return enviar(
+        "exportacion", huella("exportacion", filtros, almacen.version_facturas()),
+        partial(_exportar_facturas, filtros, total), f"facturas_{time.strftime('%Y%m%d_%H%M%S')}.zip",
+        f"Exportación de {total:,} facturas",
+    )